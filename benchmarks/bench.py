@@ -0,0 +1,210 @@
+# Copyright © 2015-2018 STRG.AT GmbH, Vienna, Austria
+# Copyright © 2018-2020 Necdet Can Ateşman <can@atesman.at>, Vienna, Austria
+#
+# This file is part of the The SCORE Framework.
+#
+# The SCORE Framework and all its parts are free software: you can redistribute
+# them and/or modify them under the terms of the GNU Lesser General Public
+# License version 3 as published by the Free Software Foundation which is in
+# the file named COPYING.LESSER.txt.
+#
+# The SCORE Framework and all its parts are distributed without any WARRANTY;
+# without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. For more details see the GNU Lesser General Public
+# License.
+#
+# If you have not received a copy of the GNU Lesser General Public License see
+# http://www.gnu.org/licenses/.
+#
+# The License-Agreement realised between you as Licensee and STRG.AT GmbH as
+# Licenser including the issue of its valid conclusion and its pre- and
+# post-contractual effects is governed by the laws of Austria. Any disputes
+# concerning this License-Agreement including the issue of its valid conclusion
+# and its pre- and post-contractual effects are exclusively decided by the
+# competent court, in whose district STRG.AT GmbH has its registered seat, at
+# the discretion of STRG.AT GmbH also the competent court, in whose district
+# the Licensee has his registered seat, an establishment or assets.
+
+
+"""
+Benchmarks for the hot paths of score.jsapi. Usage::
+
+    python benchmarks/bench.py                      # run everything
+    python benchmarks/bench.py -k handle            # only matching benchmarks
+    python benchmarks/bench.py --save base.json     # store the results ...
+    python benchmarks/bench.py --compare base.json  # ... and compare later
+
+Every benchmark is repeated several times and the best time per iteration is
+reported, which is the value least affected by other processes.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import timeit
+
+import score.http
+import score.init
+from score.jsapi import UrlEndpoint
+from score.jsapi.exc2json import _format_frames, exc2json
+
+
+BATCH_SIZES = (1, 10, 100, 1000)
+
+OP_COUNTS = (10, 100, 1000)
+
+TRACEBACK_DEPTHS = (10, 100)
+
+
+def make_endpoint(name, op_count=1):
+    endpoint = UrlEndpoint(name)
+
+    @endpoint.op
+    def add(ctx, a, b):
+        return a + b
+
+    for i in range(op_count - 1):
+        def operation(ctx, value, flag=False):
+            return value
+        operation.__name__ = 'op%d' % (i,)
+        endpoint.op(operation)
+    return endpoint
+
+
+def make_score(*endpoints, **jsapi_conf):
+    score_ = score.init.init({
+        'score.init': {
+            'modules': '\n'.join((
+                'score.ctx', 'score.tpl', 'score.http', 'score.jsapi')),
+        },
+        'tpl': {'filetype.js.mimetype': 'application/javascript'},
+        'http': {'router': score.http.RouterConfiguration()},
+        'jsapi': jsapi_conf,
+    }, finalize=False)
+    for endpoint in endpoints:
+        score_.jsapi.add_endpoint(endpoint)
+    score_._finalize()
+    return score_
+
+
+def recurse(depth):
+    if depth <= 1:
+        raise ValueError('bottom')
+    recurse(depth - 1)
+
+
+def excinfo(depth):
+    try:
+        recurse(depth)
+    except ValueError:
+        return sys.exc_info()
+
+
+def benchmarks():
+    """
+    Generates tuples of benchmark names and functions to measure.
+    """
+    endpoint = make_endpoint('bench')
+    make_score(endpoint)
+
+    for size in BATCH_SIZES:
+        requests = [['add', '', i, 1] for i in range(size)]
+        yield ('handle[%d]' % size,
+               lambda requests=requests: endpoint.handle(requests))
+
+    def add(ctx, a, b):
+        return a + b
+    yield 'direct call', lambda: add(None, 1, 2)
+    yield 'Endpoint.call', lambda: endpoint.call('add', '', [1, 2])
+    # the dispatch overhead without the cost of creating a context
+    yield 'Endpoint._invoke', lambda: endpoint._invoke(None, 'add', '', [1, 2])
+
+    for depth in TRACEBACK_DEPTHS:
+        info = excinfo(depth)
+
+        def format_cold(info=info):
+            # the formatted frames are cached, which would otherwise turn
+            # every but the first iteration into a cache hit
+            _format_frames.cache_clear()
+            return exc2json(info)
+        yield 'exc2json[%d]' % depth, format_cold
+        yield ('exc2json[%d] cached' % depth,
+               lambda info=info: exc2json(info))
+
+    for count in OP_COUNTS:
+        ops_endpoint = make_endpoint('ops%d' % count, count)
+        make_score(ops_endpoint)
+
+        def render(endpoint=ops_endpoint):
+            endpoint._ops_js = None
+            return endpoint._render_ops_js()
+        yield '_render_ops_js[%d]' % count, render
+
+    for count in OP_COUNTS:
+        jsapi = make_score(make_endpoint('build%d' % count, count)).jsapi
+        folder = tempfile.mkdtemp()
+
+        def build(jsapi=jsapi, folder=folder):
+            # fresh caches and target folder, so that all files are
+            # rendered and written
+            for endpoint in jsapi.endpoints.values():
+                endpoint._ops_js = None
+            jsapi._build_digests.clear()
+            shutil.rmtree(folder)
+            return jsapi.build(folder)
+        yield 'build[%d]' % count, build
+
+        def rebuild(jsapi=jsapi, folder=folder):
+            return jsapi.build(folder)
+        yield 'rebuild[%d]' % count, rebuild
+
+
+def measure(func, repeat):
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat, number)) / number
+
+
+def format_time(seconds):
+    for unit, factor in (('s', 1), ('ms', 1e3), ('us', 1e6)):
+        if seconds >= 1 / factor:
+            return '%8.2f%s' % (seconds * factor, unit)
+    return '%8.2fns' % (seconds * 1e9)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('.')[0])
+    parser.add_argument('-k', dest='pattern', default='',
+                        help='only run benchmarks containing this string')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='number of measurements per benchmark')
+    parser.add_argument('--save', metavar='FILE',
+                        help='write the results to a json file')
+    parser.add_argument('--compare', metavar='FILE',
+                        help='compare with results saved earlier')
+    args = parser.parse_args(argv)
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as fp:
+            baseline = json.load(fp)
+    results = {}
+    for name, func in benchmarks():
+        if args.pattern not in name:
+            continue
+        results[name] = measure(func, args.repeat)
+        line = '%-24s %s' % (name, format_time(results[name]))
+        if name in baseline:
+            line += '  %+7.1f%%' % (
+                100 * (results[name] / baseline[name] - 1))
+        print(line)
+    if args.save:
+        with open(args.save, 'w') as fp:
+            json.dump(results, fp, indent=2, sort_keys=True)
+            fp.write(os.linesep)
+
+
+if __name__ == '__main__':
+    main()
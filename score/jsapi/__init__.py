@@ -26,9 +26,17 @@
 # the Licensee has his registered seat, an establishment or assets.
 
 from ._init import init, ConfiguredJsapiModule
-from ._endpoint import Endpoint, UrlEndpoint, SafeException
+from ._endpoint import Endpoint, UrlEndpoint, SafeException, BudgetExceeded
+from ._codec import JsonCodec, OrjsonCodec, MsgpackCodec
+from ._cache import Cache
+from ._columns import Columns
+from ._limit import Limiter, RateLimitExceeded
+from ._metrics import Metrics
+from ._profile import Profiler
 
 __version__ = '0.4.20'
 
 __all__ = ('init', 'ConfiguredJsapiModule', 'Endpoint', 'UrlEndpoint',
-           'SafeException')
+           'SafeException', 'BudgetExceeded', 'JsonCodec', 'OrjsonCodec',
+           'MsgpackCodec', 'Cache', 'Columns', 'Limiter', 'RateLimitExceeded',
+           'Metrics', 'Profiler')
@@ -0,0 +1,161 @@
+# Copyright © 2015-2018 STRG.AT GmbH, Vienna, Austria
+# Copyright © 2018-2020 Necdet Can Ateşman <can@atesman.at>, Vienna, Austria
+#
+# This file is part of the The SCORE Framework.
+#
+# The SCORE Framework and all its parts are free software: you can redistribute
+# them and/or modify them under the terms of the GNU Lesser General Public
+# License version 3 as published by the Free Software Foundation which is in
+# the file named COPYING.LESSER.txt.
+#
+# The SCORE Framework and all its parts are distributed without any WARRANTY;
+# without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. For more details see the GNU Lesser General Public
+# License.
+#
+# If you have not received a copy of the GNU Lesser General Public License see
+# http://www.gnu.org/licenses/.
+#
+# The License-Agreement realised between you as Licensee and STRG.AT GmbH as
+# Licenser including the issue of its valid conclusion and its pre- and
+# post-contractual effects is governed by the laws of Austria. Any disputes
+# concerning this License-Agreement including the issue of its valid conclusion
+# and its pre- and post-contractual effects are exclusively decided by the
+# competent court, in whose district STRG.AT GmbH has its registered seat, at
+# the discretion of STRG.AT GmbH also the competent court, in whose district
+# the Licensee has his registered seat, an establishment or assets.
+
+
+import collections
+import json
+import threading
+import time
+
+
+class Cache:
+    """
+    A bounded cache for the results of an :class:`.Endpoint` operation, which
+    can be passed to :meth:`.Endpoint.op`:
+
+    .. code-block:: python
+
+        @endpoint.op(cache=Cache(ttl=60, maxsize=10000))
+        def get_countries(ctx, language):
+            return ctx.db.query(Country.name).all()
+
+    Results are stored for *ttl* seconds (or indefinitely, if *ttl* is `None`)
+    and the least recently used entry is evicted once the cache exceeds
+    *maxsize* entries. The cache key consists of the operation's name and
+    version, and a canonical representation of the arguments. The
+    optional *key* callable will receive the :class:`score.ctx.Context` and
+    may return an additional hashable value for the cache key, the id of the
+    current user, for example.
+
+    Only successful invocations are cached. Note that preroutes are still
+    executed for every call, so authorization checks remain effective.
+
+    The attributes :attr:`hits` and :attr:`misses` count the lookups that
+    could and could not be answered from the cache, respectively.
+
+    A single Cache object may be shared by multiple operations.
+    """
+
+    def __init__(self, *, ttl=None, maxsize=1024, key=None):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.key = key
+        self.hits = 0
+        self.misses = 0
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def make_key(self, ctx, operation, arguments):
+        """
+        Generates the cache key for invoking the *operation* with given
+        *arguments*.
+        """
+        key = (operation.score_jsapi_op_name,
+               operation.score_jsapi_op_version,
+               _canonical_key(arguments))
+        if self.key is not None:
+            key += (self.key(ctx),)
+        return key
+
+    def get(self, key):
+        """
+        Looks up given *key* and returns a tuple consisting of a boolean
+        indicating whether the *key* was found, and the cached value.
+        """
+        with self._lock:
+            try:
+                expires, value = self._entries[key]
+            except KeyError:
+                self.misses += 1
+                return False, None
+            if expires is not None and expires <= time.monotonic():
+                del self._entries[key]
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, value
+
+    def set(self, key, value):
+        """
+        Stores a *value* under given *key*, evicting the least recently used
+        entries, if the cache grows beyond its *maxsize*.
+        """
+        expires = None
+        if self.ttl is not None:
+            expires = time.monotonic() + self.ttl
+        with self._lock:
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            if self.maxsize:
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+
+    def invalidate(self, name=None, version=None, arguments=None):
+        """
+        Removes cached values. Calling this function without arguments will
+        clear the whole cache. Otherwise only the entries of the operation
+        with given *name* will be removed, optionally reduced to a single
+        *version* and a specific `list` of *arguments*.
+        """
+        with self._lock:
+            if name is None:
+                self._entries.clear()
+                return
+            if arguments is not None:
+                arguments = _canonical_key(arguments)
+            for key in list(self._entries):
+                if key[0] != name:
+                    continue
+                if version is not None and key[1] != str(version):
+                    continue
+                if arguments is not None and key[2] != arguments:
+                    continue
+                del self._entries[key]
+
+
+def _canonical_key(value):
+    """
+    Returns a string, that is equal for all equal *value*s and differs for
+    all others. Unlike :func:`json.dumps`, this function also accepts all
+    other values decoded by msgpack: bytes, maps with arbitrary keys and
+    extension types.
+    """
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return json.dumps(value)
+    if type(value) in (list, tuple):
+        return '[%s]' % ','.join(map(_canonical_key, value))
+    if isinstance(value, dict):
+        items = sorted((_canonical_key(k), _canonical_key(v))
+                       for k, v in value.items())
+        return '{%s}' % ','.join('%s:%s' % item for item in items)
+    if isinstance(value, (bytes, bytearray)):
+        return 'b"%s"' % (bytes(value).hex(),)
+    return '%s:%r' % (type(value).__name__, value)
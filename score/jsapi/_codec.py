@@ -0,0 +1,135 @@
+# Copyright © 2015-2018 STRG.AT GmbH, Vienna, Austria
+# Copyright © 2018-2020 Necdet Can Ateşman <can@atesman.at>, Vienna, Austria
+#
+# This file is part of the The SCORE Framework.
+#
+# The SCORE Framework and all its parts are free software: you can redistribute
+# them and/or modify them under the terms of the GNU Lesser General Public
+# License version 3 as published by the Free Software Foundation which is in
+# the file named COPYING.LESSER.txt.
+#
+# The SCORE Framework and all its parts are distributed without any WARRANTY;
+# without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. For more details see the GNU Lesser General Public
+# License.
+#
+# If you have not received a copy of the GNU Lesser General Public License see
+# http://www.gnu.org/licenses/.
+#
+# The License-Agreement realised between you as Licensee and STRG.AT GmbH as
+# Licenser including the issue of its valid conclusion and its pre- and
+# post-contractual effects is governed by the laws of Austria. Any disputes
+# concerning this License-Agreement including the issue of its valid conclusion
+# and its pre- and post-contractual effects are exclusively decided by the
+# competent court, in whose district STRG.AT GmbH has its registered seat, at
+# the discretion of STRG.AT GmbH also the competent court, in whose district
+# the Licensee has his registered seat, an establishment or assets.
+
+
+import json
+import logging
+
+from score.init import parse_dotted_path
+
+log = logging.getLogger('score.jsapi')
+
+
+class JsonCodec:
+    """
+    Codec for the wire format of a :class:`.UrlEndpoint` using python's
+    builtin :mod:`json` module.
+    """
+
+    content_type = 'application/json'
+
+    def loads(self, data):
+        """
+        Decodes a request *data*, which may be `bytes` or `str`.
+        """
+        return json.loads(data)
+
+    def dumps(self, obj):
+        """
+        Encodes a response object into `bytes`.
+        """
+        return json.dumps(obj, separators=(',', ':')).encode('UTF-8')
+
+
+class OrjsonCodec(JsonCodec):
+    """
+    A :class:`JsonCodec` using the considerably faster orjson_ library, which
+    decodes directly from `bytes` and encodes directly into `bytes`.
+
+    .. _orjson: https://github.com/ijl/orjson
+    """
+
+    def __init__(self):
+        import orjson
+        self.orjson = orjson
+
+    def loads(self, data):
+        return self.orjson.loads(data)
+
+    def dumps(self, obj):
+        return self.orjson.dumps(obj, option=self.orjson.OPT_NON_STR_KEYS)
+
+
+class MsgpackCodec:
+    """
+    Codec for the binary wire format of :class:`UrlEndpoints <.UrlEndpoint>`
+    created with ``binary=True``, which uses MessagePack_ via the msgpack_
+    library.
+
+    .. _MessagePack: https://msgpack.org/
+    .. _msgpack: https://pypi.org/project/msgpack/
+    """
+
+    content_type = 'application/msgpack'
+
+    # alternative content types found in the wild
+    content_types = ('application/msgpack', 'application/x-msgpack',
+                     'application/vnd.msgpack')
+
+    def __init__(self):
+        import msgpack
+        self.msgpack = msgpack
+
+    def loads(self, data):
+        """
+        Decodes a request *data*, which must be `bytes`.
+        """
+        return self.msgpack.unpackb(data, raw=False, strict_map_key=False)
+
+    def dumps(self, obj):
+        """
+        Encodes a response object into `bytes`.
+        """
+        return self.msgpack.packb(obj, use_bin_type=True)
+
+
+def parse_codec(value):
+    """
+    Converts a configuration *value* into a codec object. Valid values are
+    "json" for the builtin :class:`JsonCodec`, "orjson" for the
+    :class:`OrjsonCodec`, or a :func:`dotted path
+    <score.init.parse_dotted_path>` to a custom codec (or codec class)
+    providing the same interface.
+
+    The "orjson" codec will fall back to the builtin :class:`JsonCodec`, if
+    the orjson library is not installed.
+    """
+    if not isinstance(value, str):
+        codec = value
+    elif value == 'json':
+        return JsonCodec()
+    elif value == 'orjson':
+        try:
+            return OrjsonCodec()
+        except ImportError:
+            log.warning('orjson not installed, falling back to json codec')
+            return JsonCodec()
+    else:
+        codec = parse_dotted_path(value)
+    if isinstance(codec, type):
+        codec = codec()
+    return codec
@@ -0,0 +1,139 @@
+# Copyright © 2015-2018 STRG.AT GmbH, Vienna, Austria
+# Copyright © 2018-2020 Necdet Can Ateşman <can@atesman.at>, Vienna, Austria
+#
+# This file is part of the The SCORE Framework.
+#
+# The SCORE Framework and all its parts are free software: you can redistribute
+# them and/or modify them under the terms of the GNU Lesser General Public
+# License version 3 as published by the Free Software Foundation which is in
+# the file named COPYING.LESSER.txt.
+#
+# The SCORE Framework and all its parts are distributed without any WARRANTY;
+# without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. For more details see the GNU Lesser General Public
+# License.
+#
+# If you have not received a copy of the GNU Lesser General Public License see
+# http://www.gnu.org/licenses/.
+#
+# The License-Agreement realised between you as Licensee and STRG.AT GmbH as
+# Licenser including the issue of its valid conclusion and its pre- and
+# post-contractual effects is governed by the laws of Austria. Any disputes
+# concerning this License-Agreement including the issue of its valid conclusion
+# and its pre- and post-contractual effects are exclusively decided by the
+# competent court, in whose district STRG.AT GmbH has its registered seat, at
+# the discretion of STRG.AT GmbH also the competent court, in whose district
+# the Licensee has his registered seat, an establishment or assets.
+
+
+import array
+import sys
+
+
+# largest integer, that javascript can represent exactly
+MAX_SAFE_INTEGER = 2 ** 53 - 1
+
+
+class Columns:
+    """
+    Wrapper for a list of *records* (i.e. `dicts`), that should be sent to
+    the javascript client column by column: The keys are transferred once,
+    followed by a list of values for each key. An operation can either return
+    such an object, or be registered with ``columnar=True`` to have all of its
+    list results converted:
+
+    .. code-block:: python
+
+        @endpoint.op
+        def get_measurements(ctx, sensor):
+            measurements = ctx.db.query(Measurement).filter_by(sensor=sensor)
+            return Columns({'time': m.time, 'value': m.value}
+                           for m in measurements)
+
+    The keys default to all keys found in the *records*, in order of their
+    first appearance. Records lacking one of the keys will receive `None` for
+    that key in javascript.
+
+    The javascript client rehydrates the records, so the operation's promise
+    resolves to an array of objects as usual. That array additionally has a
+    (non-enumerable) property ``columns``, an object mapping each key to its
+    column. Creating these records can be costly for large results, that are
+    only processed column by column: If *rehydrate* is `False`, the promise
+    resolves to the ``columns`` object instead.
+
+    Numeric columns of :class:`binary <.UrlEndpoint>` endpoints are packed
+    into little-endian bytes, and will be available as `Int32Array` or
+    `Float64Array` in javascript.
+
+    Iterating a Columns object yields the original records.
+    """
+
+    def __init__(self, records, keys=None, *, rehydrate=True):
+        records = list(records)
+        for record in records:
+            if not isinstance(record, dict):
+                raise TypeError(
+                    'Columns require dict records, got %s' %
+                    type(record).__name__)
+        if keys is None:
+            keys = dict.fromkeys(key for record in records for key in record)
+        self.records = records
+        self.keys = list(keys)
+        self.rehydrate = rehydrate
+
+    def __iter__(self):
+        return iter(self.records)
+
+    def __len__(self):
+        return len(self.records)
+
+    def encode(self, binary=False):
+        """
+        Returns the json-compatible column representation of the records,
+        packing numeric columns into `bytes` if *binary* is `True`.
+        """
+        columns = [[record.get(key) for record in self.records]
+                   for key in self.keys]
+        result = {
+            'length': len(self.records),
+            'keys': self.keys,
+            'columns': columns,
+        }
+        if not self.rehydrate:
+            result['rehydrate'] = False
+        if binary:
+            types = [None] * len(columns)
+            for i, column in enumerate(columns):
+                packed = _pack(column)
+                if packed is not None:
+                    types[i], columns[i] = packed
+            if any(types):
+                result['types'] = types
+        return result
+
+
+def _pack(column):
+    """
+    Packs a *column* of numbers into the little-endian bytes of a javascript
+    typed array. Returns a tuple of the array type and the packed `bytes`, or
+    `None`, if the column cannot be packed.
+    """
+    if not column:
+        return None
+    kinds = set(map(type, column))
+    if kinds == {int}:
+        low, high = min(column), max(column)
+        if -2 ** 31 <= low and high < 2 ** 31:
+            kind, typecode = 'int32', 'i'
+        elif -MAX_SAFE_INTEGER <= low and high <= MAX_SAFE_INTEGER:
+            kind, typecode = 'float64', 'd'
+        else:
+            return None
+    elif kinds <= {int, float}:
+        kind, typecode = 'float64', 'd'
+    else:
+        return None
+    values = array.array(typecode, column)
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return kind, values.tobytes()
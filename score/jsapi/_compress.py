@@ -0,0 +1,115 @@
+# Copyright © 2015-2018 STRG.AT GmbH, Vienna, Austria
+# Copyright © 2018-2020 Necdet Can Ateşman <can@atesman.at>, Vienna, Austria
+#
+# This file is part of the The SCORE Framework.
+#
+# The SCORE Framework and all its parts are free software: you can redistribute
+# them and/or modify them under the terms of the GNU Lesser General Public
+# License version 3 as published by the Free Software Foundation which is in
+# the file named COPYING.LESSER.txt.
+#
+# The SCORE Framework and all its parts are distributed without any WARRANTY;
+# without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. For more details see the GNU Lesser General Public
+# License.
+#
+# If you have not received a copy of the GNU Lesser General Public License see
+# http://www.gnu.org/licenses/.
+#
+# The License-Agreement realised between you as Licensee and STRG.AT GmbH as
+# Licenser including the issue of its valid conclusion and its pre- and
+# post-contractual effects is governed by the laws of Austria. Any disputes
+# concerning this License-Agreement including the issue of its valid conclusion
+# and its pre- and post-contractual effects are exclusively decided by the
+# competent court, in whose district STRG.AT GmbH has its registered seat, at
+# the discretion of STRG.AT GmbH also the competent court, in whose district
+# the Licensee has his registered seat, an establishment or assets.
+
+
+import gzip
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def _gzip(data, level):
+    # a fixed mtime keeps the output stable for unchanged input
+    return gzip.compress(data, compresslevel=min(level, 9), mtime=0)
+
+
+def _brotli(data, level):
+    return brotli.compress(data, quality=min(level, 11))
+
+
+#: Maps each supported content encoding to the file extension of its
+#: pre-compressed files, a compression function, the default compression
+#: level and the maximum compression level, ordered by preference.
+encodings = {
+    'br': ('.br', _brotli, 5, 11),
+    'gzip': ('.gz', _gzip, 6, 9),
+}
+
+
+def available_encodings():
+    """
+    Returns the `list` of encodings supported in the current environment, in
+    order of preference.
+    """
+    return [encoding for encoding in encodings
+            if encoding != 'br' or brotli is not None]
+
+
+def compress(data, encoding, level=None):
+    """
+    Compresses `bytes` *data* with given *encoding* ("gzip" or "br"). The
+    *level* defaults to a value suitable for compressing on the fly.
+    """
+    extension, compressor, default_level, max_level = encodings[encoding]
+    if level is None:
+        level = default_level
+    return compressor(data, level)
+
+
+def extension(encoding):
+    """
+    Returns the file extension for pre-compressed files of given *encoding*.
+    """
+    return encodings[encoding][0]
+
+
+def max_level(encoding):
+    """
+    Returns the highest compression level of given *encoding*, which is
+    suitable for pre-compressing files.
+    """
+    return encodings[encoding][3]
+
+
+def negotiate(accept_encoding):
+    """
+    Determines the preferred encoding in the current environment, that is
+    acceptable according to given value of an *Accept-Encoding* header.
+    Returns `None`, if none of the available encodings is acceptable.
+    """
+    if not accept_encoding:
+        return None
+    qualities = {}
+    for part in accept_encoding.split(','):
+        name, _, params = part.partition(';')
+        quality = 1.0
+        for param in params.split(';'):
+            key, _, value = param.partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[name.strip().lower()] = quality
+    best, best_quality = None, 0
+    for encoding in available_encodings():
+        quality = qualities.get(encoding, qualities.get('*', 0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
@@ -26,19 +26,116 @@
 # the Licensee has his registered seat, an establishment or assets.
 
 import abc
+import asyncio
 import collections
+import concurrent.futures
+import contextlib
 import functools
 import inspect
 import json
 import logging
 import sys
 import textwrap
+import threading
 import time
 
+from ._columns import Columns
 from .exc2json import exc2json
 
 log = logging.getLogger('score.jsapi')
 
+# operation name, under which calls to unknown operations are recorded
+UNKNOWN_OPERATION = '(unknown)'
+
+
+def _run(coroutine):
+    """
+    Runs a *coroutine* to completion in a new event loop and returns its
+    result. If the current thread is already running an event loop, the new
+    loop runs in a separate thread, while the current thread waits for it.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        running = False
+    else:
+        running = True
+    if not running:
+        return asyncio.run(coroutine)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coroutine).result()
+
+
+def _resolve(result):
+    """
+    Runs *result* to completion in a new event loop, if it is
+    :term:`awaitable`. Coroutine functions are dispatched via :func:`_run`
+    before they get here, so this only applies to synchronous callbacks
+    returning awaitables.
+    """
+    if not inspect.isawaitable(result):
+        return result
+
+    async def wait():
+        return await result
+    return _run(wait())
+
+
+def _is_coroutine(callback):
+    return inspect.iscoroutinefunction(callback.__wrapped__)
+
+
+def _prerouted(preroutes, invoke):
+    """
+    Wraps an invoker created by :meth:`Endpoint._make_invoker`, so that the
+    given *preroutes* run before the operation.
+    """
+    def call(ctx, arguments):
+        for preroute in preroutes:
+            _resolve(preroute(ctx))
+        return invoke(ctx, arguments)
+    return call
+
+
+async def _aresolve(result):
+    """
+    Awaits *result*, if it is :term:`awaitable`.
+    """
+    if inspect.isawaitable(result):
+        return await result
+    return result
+
+
+def _columnar(operation, result):
+    """
+    Wraps the *result* of a *columnar* operation in :class:`.Columns`, if it
+    is a list of dicts. Other results are returned unchanged.
+    """
+    columnar = operation.score_jsapi_op_columnar
+    if not columnar or not isinstance(result, list) or \
+            not all(isinstance(record, dict) for record in result):
+        return result
+    return Columns(result, rehydrate=(columnar != 'columns'))
+
+
+class OperationSignature:
+    """
+    Compact record of a callback's signature, computed once upon registration
+    of an operation or preroute. The first parameter (the context) is not
+    part of :attr:`argnames`, :attr:`minargs` and :attr:`maxargs`.
+    """
+
+    __slots__ = ('parameters', 'argnames', 'minargs', 'maxargs')
+
+    def __init__(self, callback):
+        parameters = inspect.signature(callback).parameters
+        self.parameters = tuple(parameters)
+        arguments = list(parameters.values())[1:]
+        self.argnames = tuple(param.name for param in arguments)
+        self.maxargs = len(arguments)
+        self.minargs = sum(1 for param in arguments
+                           if param.default == inspect.Parameter.empty)
+
 
 class EndpointOperation:
     """
@@ -46,9 +143,18 @@ class EndpointOperation:
     """
 
     def __init__(self, name, endpoint, callback, *,
-                 version='', first_version=None):
+                 version='', first_version=None, cache=None, max_age=None,
+                 public=False, coalesce=False, client_ttl=None,
+                 columnar=False, limit=None):
         self.score_jsapi_op_name = name
         self.score_jsapi_op_version = str(version)
+        self.score_jsapi_op_cache = cache
+        self.score_jsapi_op_max_age = max_age
+        self.score_jsapi_op_public = public
+        self.score_jsapi_op_coalesce = coalesce
+        self.score_jsapi_op_client_ttl = client_ttl
+        self.score_jsapi_op_columnar = columnar
+        self.score_jsapi_op_limit = limit
         self.__endpoint = endpoint
         if first_version:
             self.first_version = first_version
@@ -58,6 +164,7 @@ class EndpointOperation:
             self.__versions = []
         # The next call will store the callback as self.__wrapped__
         functools.update_wrapper(self, callback)
+        self.score_jsapi_op_signature = OperationSignature(callback)
         # Register this operation with the endpoint
         self.__endpoint._register_op(self)
 
@@ -67,9 +174,10 @@ class EndpointOperation:
         """
         return self.__wrapped__(*args, **kwargs)
 
-    def score_jsapi_create_version(self, name):
+    def score_jsapi_create_version(self, name, **options):
         """
         Create a wrapper function for a newer version of this operation.
+        The optional keyword arguments are the same as in :meth:`Endpoint.op`.
 
         The alias of this function is just `version`, so you can create newer
         versions of your operations with the following code:
@@ -122,7 +230,7 @@ class EndpointOperation:
         def version_annotation(callback):
             return EndpointOperation(
                 self.score_jsapi_op_name, self.__endpoint, callback,
-                version=name, first_version=self.first_version)
+                version=name, first_version=self.first_version, **options)
         return version_annotation
 
     version = score_jsapi_create_version
@@ -141,6 +249,7 @@ class EndpointPreroute:
         self.__endpoint = endpoint
         # The next call will store the callback as self.__wrapped__
         functools.update_wrapper(self, callback)
+        self.score_jsapi_preroute_signature = OperationSignature(callback)
         # Register this operation with the endpoint
         self.__endpoint._register_preroute(self)
 
@@ -151,15 +260,32 @@ class EndpointPreroute:
         return self.__wrapped__(*args, **kwargs)
 
 
+def _check_ctx_parameter(signature):
+    for argname in signature.parameters:
+        if argname in ('self', 'cls'):
+            continue
+        if argname not in ('ctx', '_ctx'):
+            raise ValueError("First argument must be the context 'ctx'")
+        break
+
+
 class Endpoint(metaclass=abc.ABCMeta):
     """
     An endpoint capable of handling requests from javascript.
+
+    The optional :class:`.Limiter` *limit* applies to the calls of all
+    operations of this endpoint.
     """
 
-    def __init__(self, name):
+    def __init__(self, name, *, limit=None):
         self.name = name
+        self.limit = limit
         self.ops = collections.OrderedDict()
         self.preroutes = []
+        self._ops_js = None
+        self._invokers = None
+        self._dispatch = None
+        self._coroutines = None
 
     def preroute(self, func):
         """
@@ -168,14 +294,43 @@ class Endpoint(metaclass=abc.ABCMeta):
         """
         return EndpointPreroute(self, func)
 
-    def op(self, func):
+    def op(self, func=None, **options):
         """
         Registers an operation with this Endpoint. It will be available with
         the same name and the same number of arguments in javascript. Note that
         javascript has no support for keyword arguments and :ref:`keyword-only
         parameters <python:keyword-only_parameter>` will confuse this function.
+
+        This function can also be called with keyword arguments to configure
+        the operation:
+
+        - *cache*: A :class:`.Cache` for storing the results of this
+          operation on the server.
+        - *max_age*: The number of seconds, browsers and proxies may cache the
+          result of this operation. Only applies to :class:`UrlEndpoints
+          <.UrlEndpoint>` using the GET method.
+        - *public*: Whether the result of this operation may be stored in
+          shared caches, like CDNs. Defaults to `False`, allowing only the
+          browser to cache the result.
+        - *coalesce*: Whether the javascript client may merge identical calls
+          to this operation into a single request. Calls will be merged with
+          pending calls, as well as calls that were already sent to the
+          server, so this should only be enabled for idempotent operations.
+        - *client_ttl*: The number of seconds, the javascript client may
+          answer repeated calls with the same arguments from its in-memory
+          cache. The cache can be cleared in javascript by calling
+          ``jsapi.invalidate(operationName)``.
+        - *columnar*: Whether results of this operation, that are lists of
+          dicts, should be sent to :class:`UrlEndpoint` clients column by
+          column. The javascript client will receive the columns without
+          rehydrating the records, if this value is ``'columns'``. See
+          :class:`.Columns` for details.
+        - *limit*: A :class:`.Limiter` restricting the rate and concurrency
+          of calls to this operation.
         """
-        return EndpointOperation(func.__name__, self, func)
+        if func is None:
+            return functools.partial(self.op, **options)
+        return EndpointOperation(func.__name__, self, func, **options)
 
     def _register_op(self, operation):
         """
@@ -183,28 +338,66 @@ class Endpoint(metaclass=abc.ABCMeta):
         :class:`EndpointOperation`.
         """
         name = operation.score_jsapi_op_name
-        for argname in inspect.signature(operation).parameters:
-            if argname in ('self', 'cls'):
-                continue
-            if argname not in ('ctx', '_ctx'):
-                raise ValueError("First argument must be the context 'ctx'")
-            break
+        _check_ctx_parameter(operation.score_jsapi_op_signature)
         if name in self.ops:
             raise ValueError('Operation "%s" already registered' % name)
         self.ops[(name, operation.score_jsapi_op_version)] = operation
+        self._ops_js = None
+        self._invokers = self._dispatch = self._coroutines = None
 
     def _register_preroute(self, preroute):
         """
         Registers a preroute. This function is called from the constructor of
         :class:`EndpointPreroute`.
         """
-        for argname in inspect.signature(preroute).parameters:
-            if argname in ('self', 'cls'):
-                continue
-            if argname not in ('ctx', '_ctx'):
-                raise ValueError("First argument must be the context 'ctx'")
-            break
+        _check_ctx_parameter(preroute.score_jsapi_preroute_signature)
         self.preroutes.append(preroute)
+        self._invokers = self._dispatch = self._coroutines = None
+
+    def finalize(self):
+        """
+        Builds the dispatch table of this endpoint, which maps the name and
+        version of every operation to a function invoking it—including the
+        preroutes and limits—while skipping all features the operation does
+        not use. This function is called automatically, when the configured
+        module is finalized.
+
+        Registering further operations or preroutes discards the table, and
+        calls will take the slower, generic path until this function is
+        called again. The same applies to changes of the endpoint's
+        :class:`.Limiter`, which will only be picked up by the next call to
+        this function.
+        """
+        invokers = {key: self._make_invoker(operation)
+                    for key, operation in self.ops.items()}
+        preroutes = tuple(preroute.__wrapped__ for preroute in self.preroutes)
+        if preroutes:
+            self._dispatch = {key: _prerouted(preroutes, invoke)
+                              for key, invoke in invokers.items()}
+        else:
+            self._dispatch = invokers
+        self._invokers = invokers
+
+    def _make_invoker(self, operation):
+        """
+        Creates a function receiving a context and a `list` of arguments, which
+        invokes given *operation* like :meth:`._invoke`.
+        """
+        callback = operation.__wrapped__
+        if operation.score_jsapi_op_cache is not None or \
+                operation.score_jsapi_op_columnar:
+            def invoke(ctx, arguments):
+                return self._invoke_operation(ctx, operation, arguments)
+        else:
+            def invoke(ctx, arguments):
+                return _resolve(callback(ctx, *arguments))
+        if self.limit is None and operation.score_jsapi_op_limit is None:
+            return invoke
+
+        def limited(ctx, arguments):
+            with self._limited(ctx, operation):
+                return invoke(ctx, arguments)
+        return limited
 
     def call(self, name, version, arguments, ctx_members={}):
         """
@@ -229,10 +422,51 @@ class Endpoint(metaclass=abc.ABCMeta):
           will not receive a stack trace.
         - The last case (non-safe exception, expose is `False`), the *result*
           part will be `None`.
+
+        Every call is recorded in the :class:`.Metrics` of the configured
+        module and may be profiled by its :class:`.Profiler`.
         """
-        if log.isEnabledFor(logging.DEBUG):
-            start = time.time()
-        success, result = self._call(name, version, arguments, ctx_members)
+        return self._profiled(
+            name, version, arguments,
+            self._call, name, version, arguments, ctx_members)
+
+    async def acall(self, name, version, arguments, ctx_members={}):
+        """
+        Asynchronous variant of :meth:`.call`, that awaits operations and
+        preroutes defined as coroutine functions (``async def``) within the
+        running event loop. Synchronous operations and preroutes are invoked
+        as usual and will block the event loop while they run.
+        """
+        return await self._acall(name, version, arguments, ctx_members)
+
+    def _profiled(self, name, version, arguments, func, *args):
+        """
+        Invokes *func* with given *args*, profiling the invocation if the
+        module's :class:`.Profiler` decides to sample this call. Calls to
+        operations, that are not registered with this endpoint, are never
+        profiled.
+        """
+        profiler = self.conf.profiler
+        if profiler is None or not self._is_registered(name, version) \
+                or not profiler.sample():
+            return func(*args)
+        return profiler.run(self.name, name, version, arguments, func, *args)
+
+    def _record_call(self, name, version, start, exception=None):
+        """
+        Records a call, that started at the :func:`time.perf_counter_ns`
+        value *start*, in the module's :class:`.Metrics` and the debug log.
+        Calls to operations, that are not registered with this endpoint, are
+        recorded under the name :data:`UNKNOWN_OPERATION`, since *name* and
+        *version* are provided by the client.
+        """
+        duration = time.perf_counter_ns() - start
+        if self._is_registered(name, version):
+            self.conf.metrics.record_call(
+                self.name, name, version, duration, exception)
+        else:
+            self.conf.metrics.record_call(
+                self.name, UNKNOWN_OPERATION, '', duration, exception)
         if log.isEnabledFor(logging.DEBUG):
             desc = name
             if version is not None:
@@ -240,59 +474,198 @@ class Endpoint(metaclass=abc.ABCMeta):
             log.debug(
                 'Handled call to `%s` in %dms: %s',
                 desc,
-                1000 * (time.time() - start),
-                'success' if success else 'error',
+                duration / 1000000,
+                'success' if exception is None else 'error',
             )
-        return success, result
+
+    def _is_registered(self, name, version):
+        """
+        Whether an operation with given *name* and *version* exists. Both
+        values may be of any type.
+        """
+        try:
+            return (name, version) in self.ops
+        except TypeError:
+            # unhashable values
+            return False
+
+    def _has_coroutines(self, name, version):
+        """
+        Whether a call to the operation with given *name* and *version* would
+        invoke a coroutine function, either as a preroute or as the operation
+        itself.
+        """
+        if self._coroutines is None:
+            if any(_is_coroutine(preroute) for preroute in self.preroutes):
+                self._coroutines = True
+            else:
+                self._coroutines = frozenset(
+                    key for key, operation in self.ops.items()
+                    if _is_coroutine(operation))
+        if self._coroutines is True:
+            return True
+        try:
+            return (name, version) in self._coroutines
+        except TypeError:
+            # unhashable values
+            return False
 
     def _call(self, name, version, arguments, ctx_members):
         """
         Helper function for :meth:`.call`, that handles the callback
+        invocation. Calls involving coroutine functions are processed by
+        :meth:`._acall` in a single event loop, so that the preroutes and the
+        operation share the same loop.
+        """
+        if self._has_coroutines(name, version):
+            return _run(self._acall(name, version, arguments, ctx_members))
+        start = time.perf_counter_ns()
+        try:
+            with self.conf.ctx.Context() as ctx:
+                for member, value in ctx_members.items():
+                    setattr(ctx, member, value)
+                if self._dispatch is not None:
+                    result = self._dispatch[(name, version)](ctx, arguments)
+                else:
+                    for preroute in self.preroutes:
+                        _resolve(preroute(ctx))
+                    result = self._invoke(ctx, name, version, arguments)
+        except Exception as e:
+            self._record_call(name, version, start, e)
+            return False, self._error_result(e)
+        self._record_call(name, version, start)
+        return True, result
+
+    async def _acall(self, name, version, arguments, ctx_members):
+        """
+        Helper function for :meth:`.acall`, that handles the callback
         invocation.
         """
+        start = time.perf_counter_ns()
         try:
             with self.conf.ctx.Context() as ctx:
                 for member, value in ctx_members.items():
                     setattr(ctx, member, value)
                 for preroute in self.preroutes:
-                    preroute(ctx)
-                return True, self.ops[(name, version)](ctx, *arguments)
+                    await _aresolve(preroute(ctx))
+                result = await self._ainvoke(ctx, name, version, arguments)
         except Exception as e:
-            if not isinstance(e, SafeException):
-                log.exception(e)
-            if self.conf.expose:
-                result = exc2json(sys.exc_info(), [__file__])
-            elif isinstance(e, SafeException):
-                result = exc2json([type(e), str(e)])
-            else:
-                result = None
-            return False, result
+            self._record_call(name, version, start, e)
+            return False, self._error_result(e)
+        self._record_call(name, version, start)
+        return True, result
+
+    def _invoke(self, ctx, name, version, arguments):
+        """
+        Invokes the operation with given *name* and *version*, within the
+        limits of the endpoint and the operation.
+        """
+        if self._invokers is not None:
+            return self._invokers[(name, version)](ctx, arguments)
+        operation = self.ops[(name, version)]
+        if self.limit is None and operation.score_jsapi_op_limit is None:
+            return self._invoke_operation(ctx, operation, arguments)
+        with self._limited(ctx, operation):
+            return self._invoke_operation(ctx, operation, arguments)
+
+    def _invoke_operation(self, ctx, operation, arguments):
+        """
+        Invokes an *operation*, consulting its :class:`.Cache`, if it has one.
+        The result of a *columnar* operation will be wrapped in
+        :class:`.Columns`, if it is a list of dicts.
+        """
+        cache = operation.score_jsapi_op_cache
+        if cache is None:
+            result = _resolve(operation(ctx, *arguments))
+        else:
+            key = cache.make_key(ctx, operation, arguments)
+            found, result = cache.get(key)
+            if not found:
+                result = _resolve(operation(ctx, *arguments))
+                cache.set(key, result)
+        return _columnar(operation, result)
+
+    async def _ainvoke(self, ctx, name, version, arguments):
+        """
+        Asynchronous variant of :meth:`._invoke`.
+        """
+        operation = self.ops[(name, version)]
+        if self.limit is None and operation.score_jsapi_op_limit is None:
+            return await self._ainvoke_operation(ctx, operation, arguments)
+        with self._limited(ctx, operation):
+            return await self._ainvoke_operation(ctx, operation, arguments)
+
+    async def _ainvoke_operation(self, ctx, operation, arguments):
+        """
+        Asynchronous variant of :meth:`._invoke_operation`.
+        """
+        cache = operation.score_jsapi_op_cache
+        if cache is None:
+            result = await _aresolve(operation(ctx, *arguments))
+        else:
+            key = cache.make_key(ctx, operation, arguments)
+            found, result = cache.get(key)
+            if not found:
+                result = await _aresolve(operation(ctx, *arguments))
+                cache.set(key, result)
+        return _columnar(operation, result)
+
+    @contextlib.contextmanager
+    def _limited(self, ctx, operation):
+        """
+        Context manager acquiring the :class:`Limiters <.Limiter>` of this
+        endpoint and the given *operation*.
+        """
+        with contextlib.ExitStack() as stack:
+            if self.limit is not None:
+                stack.enter_context(self.limit.acquire(ctx))
+            if operation.score_jsapi_op_limit is not None:
+                stack.enter_context(
+                    operation.score_jsapi_op_limit.acquire(ctx))
+            yield
+
+    def _error_result(self, exception):
+        """
+        Converts an *exception* caught during an operation invocation into the
+        result value described in :meth:`.call`. Must be called from within
+        the ``except`` block handling the *exception*.
+        """
+        if not isinstance(exception, SafeException):
+            log.exception(exception)
+        if self.conf.expose:
+            result = exc2json(sys.exc_info(), [__file__],
+                              source=self.conf.expose_source,
+                              depth=self.conf.expose_depth)
+        elif isinstance(exception, SafeException):
+            result = exc2json([type(exception), str(exception)])
+        else:
+            return None
+        if getattr(exception, 'retry_after', None) is not None:
+            result['retry_after'] = exception.retry_after
+        return result
 
     def _render_ops_js(self):
+        if self._ops_js is not None:
+            return self._ops_js
         op_defs = []
         for key in sorted(self.ops):
             funcname, version = key
-            func = self.ops[key]
-            minargs = 0
-            maxargs = 0
-            argnames = []
-            skipped_ctx = False
-            for name, param in inspect.signature(func).parameters.items():
-                if not skipped_ctx:
-                    skipped_ctx = True
-                    continue
-                argnames.append(name)
-                maxargs += 1
-                if param.default == inspect.Parameter.empty:
-                    minargs += 1
-            op_defs.append(collections.OrderedDict((
+            operation = self.ops[key]
+            signature = operation.score_jsapi_op_signature
+            op_def = collections.OrderedDict((
                 ("name", funcname),
                 ("version", version),
-                ("minargs", minargs),
-                ("maxargs", maxargs),
-                ("argnames", argnames),
-            )))
-        return json.dumps(op_defs)
+                ("minargs", signature.minargs),
+                ("maxargs", signature.maxargs),
+                ("argnames", signature.argnames),
+            ))
+            if operation.score_jsapi_op_coalesce:
+                op_def["coalesce"] = True
+            if operation.score_jsapi_op_client_ttl:
+                op_def["ttl"] = operation.score_jsapi_op_client_ttl
+            op_defs.append(op_def)
+        self._ops_js = json.dumps(op_defs)
+        return self._ops_js
 
     @abc.abstractmethod
     def render_js(self, conf):
@@ -302,6 +675,80 @@ class Endpoint(metaclass=abc.ABCMeta):
 class UrlEndpoint(Endpoint):
     """
     An Endpoint, which can be accessed via AJAX from javascript.
+
+    The optional *concurrency* parameter enables concurrent processing of the
+    calls in a single batch. It can either be the number of threads to use, or
+    an existing :class:`concurrent.futures.Executor`. The time required for
+    handling a batch will then roughly equal the duration of its slowest call.
+    Note that your operations (and everything they access through the context)
+    must be thread-safe, if you enable this feature.
+
+    Operations and preroutes may also be coroutine functions (``async def``).
+    A call involving coroutines runs its preroutes and its operation in a
+    single event loop of its own. Setting *asynchronous* to `True` will
+    instead process each batch in one event loop via :meth:`ahandle`, which
+    allows the calls of a batch to run as concurrent tasks.
+
+    Responses can be compressed by providing a *compress_threshold*: Every
+    response of at least this many bytes will be compressed with the best
+    encoding accepted by the client (brotli, if the brotli_ package is
+    installed, or gzip). The *compress_level* will be passed to the
+    compression library and defaults to a moderate value suitable for
+    on-the-fly compression.
+
+    .. _brotli: https://pypi.org/project/Brotli/
+
+    If *streaming* is `True`, the javascript client will ask the server to
+    stream the results of a batch: Every result will then be sent as soon as
+    its call finishes, so that fast calls need not wait for slow ones. See
+    :meth:`handle_iter` for details.
+
+    The javascript client sends its requests via XMLHttpRequest by default.
+    Setting *transport* to ``"fetch"`` will use the Fetch API instead, which
+    allows small requests to outlive the page (via the "keepalive" flag) and
+    supports a client-side *timeout*: The number of seconds after which a
+    request to this endpoint is aborted and all of its calls are rejected.
+
+    By default, every call receives its own :class:`score.ctx.Context`, which
+    also means that all preroutes run once per call. Setting *batch_context*
+    to `True` will process all calls of a batch in a single, shared context
+    instead: Preroutes will run only once per batch and an error in a preroute
+    will be reported as the result of every call. Calls are still reported
+    individually, but the changes of failed calls will not be rolled back
+    separately. You can pass a callable instead of `True` to isolate the calls
+    from each other: It will receive the shared context and must return a
+    context manager, which wraps a single call—like a database savepoint::
+
+        endpoint = UrlEndpoint(
+            'api', batch_context=lambda ctx: ctx.db.begin_nested())
+
+    Batch contexts cannot be combined with a *concurrency* value.
+
+    Setting *binary* to `True` lets the javascript client exchange requests
+    and responses in the compact MessagePack format instead of JSON, which
+    requires the msgpack_ package. The format is negotiated via the
+    *Content-Type* and *Accept* headers, so clients requesting JSON will still
+    be served. Note that streamed results and the parameters of GET requests
+    are always encoded as JSON.
+
+    .. _msgpack: https://pypi.org/project/msgpack/
+
+    The resources a single request may claim can be limited with the
+    following parameters:
+
+    - *max_body_size*: The maximum size of a request in bytes (the body of a
+      POST request, or the query string of a GET request). Larger requests are
+      rejected with the status "413 Request Entity Too Large" before they are
+      decoded.
+    - *max_batch_size*: The maximum number of calls in a single batch. Larger
+      batches are rejected with the status "413 Batch Too Large".
+    - *time_budget*: The number of seconds, a batch may take. Calls, that
+      have not started once the budget is spent, are not invoked, but fail
+      individually with a :class:`.BudgetExceeded` exception. Calls that are
+      already running are not interrupted.
+
+    A :class:`.Limiter` passed as *limit* restricts the rate and concurrency
+    of the calls to all operations of this endpoint.
     """
 
     umd_template = textwrap.dedent('''
@@ -313,18 +760,18 @@ class UrlEndpoint(Endpoint):
         (function (root, factory) {
             if (typeof define === 'function' && define.amd) {
                 // AMD. Register as an anonymous module.
-                define(['../endpoint/url'], factory);
+                define(['../endpoint/%s'], factory);
             } else if (typeof module === 'object' && module.exports) {
                 // Node. Does not work with strict CommonJS, but
                 // only CommonJS-like environments that support module.exports,
                 // like Node.
-                module.exports = factory(require('../endpoint/url'));
+                module.exports = factory(require('../endpoint/%s'));
             } else {
-                factory(root.score.jsapi.UrlEndpoint);
+                factory(root.score.jsapi.%s);
             }
-        })(this, function(UrlEndpoint) {
+        })(this, function(%s) {
 
-            return new UrlEndpoint("%s", %s, "%s", "%s");
+            return new %s("%s", %s, "%s", "%s", %s);
 
         });
     ''').lstrip()
@@ -332,20 +779,81 @@ class UrlEndpoint(Endpoint):
     es6_template = textwrap.dedent('''
         /* eslint-disable */
         /* tslint:disable */
-        import { UrlEndpoint } from '../endpoint';
+        import { %s } from '../endpoint';
 
-        export const %s = new UrlEndpoint("%s", %s, "%s", "%s");
+        export const %s = new %s("%s", %s, "%s", "%s", %s);
 
         export default %s;
     ''').lstrip()
 
-    def __init__(self, name, *, url=None, method="POST", ctx_members=None):
-        super().__init__(name)
+    transports = {
+        'xhr': ('url', 'UrlEndpoint'),
+        'fetch': ('url/fetch', 'FetchEndpoint'),
+    }
+
+    def __init__(self, name, *, url=None, method="POST", ctx_members=None,
+                 concurrency=None, asynchronous=False,
+                 compress_threshold=None, compress_level=None,
+                 streaming=False, transport='xhr', timeout=None,
+                 batch_context=False, binary=False, max_body_size=None,
+                 max_batch_size=None, time_budget=None, limit=None):
+        super().__init__(name, limit=limit)
         self.url = url or '/jsapi/' + name
         self.method = method
         self.ctx_members = ctx_members
+        self.concurrency = concurrency
+        self.asynchronous = asynchronous
+        self.compress_threshold = compress_threshold
+        self.compress_level = compress_level
+        if streaming and asynchronous:
+            raise ValueError(
+                'Streaming is not available for asynchronous endpoints')
+        self.streaming = streaming
+        if transport not in self.transports:
+            raise ValueError('Invalid transport "%s"' % (transport,))
+        if timeout is not None and transport != 'fetch':
+            raise ValueError(
+                'Timeouts are only available with the "fetch" transport')
+        self.transport = transport
+        self.timeout = timeout
+        if batch_context and concurrency:
+            raise ValueError(
+                'Batch contexts cannot be combined with concurrent processing')
+        self.batch_context = batch_context
+        self.binary = binary
+        self.max_body_size = max_body_size
+        self.max_batch_size = max_batch_size
+        self.time_budget = time_budget
+        self._executor = None
+        self._executor_lock = threading.Lock()
 
-    def handle(self, requests, ctx_members={}):
+    @property
+    def executor(self):
+        """
+        The :class:`concurrent.futures.Executor` used for processing the calls
+        of a batch concurrently, or `None` if calls are processed one after
+        another.
+
+        The value is determined by the *concurrency* parameter of the
+        constructor: If it is an :class:`Executor
+        <concurrent.futures.Executor>`, it will be used as-is. If it is an
+        integer greater than 1, a :class:`ThreadPoolExecutor
+        <concurrent.futures.ThreadPoolExecutor>` with that many threads will be
+        created on first use.
+        """
+        if isinstance(self.concurrency, concurrent.futures.Executor):
+            return self.concurrency
+        if not self.concurrency or self.concurrency <= 1:
+            return None
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = concurrent.futures.ThreadPoolExecutor(
+                        max_workers=self.concurrency,
+                        thread_name_prefix='score.jsapi.' + self.name)
+        return self._executor
+
+    def handle(self, requests, ctx_members={}, *, binary=False):
         """
         Handles all functions calls passed with a request.
 
@@ -370,28 +878,302 @@ class UrlEndpoint(Endpoint):
         The input and output is already in the correct format for communication
         with the javascript part, so the result can be sent as
         "application/json"-encoded response to the calling javascript function.
+
+        If this endpoint was configured with a *concurrency* value, the calls
+        will be submitted to the :attr:`executor` and processed concurrently.
+        Each call still receives its own :class:`score.ctx.Context` and the
+        responses retain the order of the *requests*.
+
+        If this endpoint was configured with a *batch_context*, all calls will
+        share a single context instead.
+
+        Calls starting after the endpoint's *time_budget* was spent will fail
+        with a :class:`.BudgetExceeded` exception.
+
+        Results wrapped in :class:`.Columns` are converted into their column
+        representation and marked with the additional key "format"::
+
+            {'success': True, 'format': 'columns', 'result': {...}}
+
+        Numeric columns will be packed into `bytes` if *binary* is `True`,
+        which is only valid for responses encoded with the
+        :class:`.MsgpackCodec`.
+        """
+        calls = [(r[0], r[1], r[2:]) for r in requests]
+        executor = self.executor
+        deadline = self._deadline()
+        call = self._caller(deadline)
+        if self.batch_context:
+            results = self._call_batch(calls, ctx_members, deadline)
+        elif executor is None or len(calls) < 2:
+            results = [call(name, version, args, ctx_members)
+                       for name, version, args in calls]
+        else:
+            futures = [
+                executor.submit(call, name, version, args, ctx_members)
+                for name, version, args in calls]
+            results = [future.result() for future in futures]
+        return [self._response(success, result, binary)
+                for success, result in results]
+
+    def handle_iter(self, requests, ctx_members={}, *, binary=False):
+        """
+        Variant of :meth:`.handle`, that generates the response of each call as
+        soon as it is available. The responses contain the additional key
+        "index", which is the position of the call in the *requests*::
+
+            {'index': 1, 'success': True, 'result': 42}
+
+        The responses will be generated in the order of the *requests*, unless
+        this endpoint was configured with a *concurrency* value. In that case
+        the responses are generated in the order of completion.
+
+        Endpoints with a *batch_context* generate their responses only after
+        the shared context was closed, since closing it might still turn
+        successful calls into failures.
+        """
+        calls = [(r[0], r[1], r[2:]) for r in requests]
+        executor = self.executor
+        deadline = self._deadline()
+        call = self._caller(deadline)
+        if self.batch_context:
+            results = self._call_batch(calls, ctx_members, deadline)
+            for index, (success, result) in enumerate(results):
+                yield self._response(success, result, binary, index)
+            return
+        if executor is None or len(calls) < 2:
+            for index, (name, version, args) in enumerate(calls):
+                success, result = call(name, version, args, ctx_members)
+                yield self._response(success, result, binary, index)
+            return
+        futures = {
+            executor.submit(call, name, version, args, ctx_members): index
+            for index, (name, version, args) in enumerate(calls)}
+        for future in concurrent.futures.as_completed(futures):
+            success, result = future.result()
+            yield self._response(success, result, binary, futures[future])
+
+    async def ahandle(self, requests, ctx_members={}, *, binary=False):
+        """
+        Asynchronous variant of :meth:`.handle`, that invokes all calls via
+        :meth:`Endpoint.acall`. If this endpoint was configured with a
+        *concurrency* value, the calls will run as concurrent
+        :class:`asyncio tasks <asyncio.Task>` on the running event loop. An
+        integer *concurrency* limits the number of calls running at the same
+        time.
+        """
+        calls = [(r[0], r[1], r[2:]) for r in requests]
+        deadline = self._deadline()
+        if self.batch_context:
+            results = await self._acall_batch(calls, ctx_members, deadline)
+        elif not self.concurrency or len(calls) < 2:
+            results = []
+            for name, version, args in calls:
+                results.append(await self._acall_within(
+                    deadline, name, version, args, ctx_members))
+        else:
+            limit = len(calls)
+            if isinstance(self.concurrency, int):
+                limit = self.concurrency
+            semaphore = asyncio.Semaphore(limit)
+
+            async def call(name, version, args):
+                async with semaphore:
+                    return await self._acall_within(
+                        deadline, name, version, args, ctx_members)
+            results = await asyncio.gather(*(
+                call(name, version, args) for name, version, args in calls))
+        return [self._response(success, result, binary)
+                for success, result in results]
+
+    def _deadline(self):
+        """
+        Returns the :func:`time.perf_counter` value, after which no further
+        calls of the current batch may start, or `None`.
+        """
+        if self.time_budget is None:
+            return None
+        return time.perf_counter() + self.time_budget
+
+    def _over_budget(self, deadline, name, version):
+        """
+        Returns the failed result for a call, that would start after the
+        *deadline*, or `None` if the call may proceed.
+        """
+        if deadline is None or time.perf_counter() <= deadline:
+            return None
+        exception = BudgetExceeded(
+            'Time budget of %gs exceeded' % self.time_budget)
+        self._record_call(name, version, time.perf_counter_ns(), exception)
+        return False, exc2json([type(exception), str(exception)])
+
+    def _caller(self, deadline):
+        """
+        Returns the function for invoking the calls of a batch, which behaves
+        like :meth:`Endpoint.call`, but respects the *deadline*.
+        """
+        if deadline is None:
+            return self.call
+        return functools.partial(self._call_within, deadline)
+
+    def _call_within(self, deadline, name, version, arguments, ctx_members):
+        """
+        Invokes :meth:`Endpoint.call`, unless the *deadline* has passed.
+        """
+        rejected = self._over_budget(deadline, name, version)
+        if rejected is not None:
+            return rejected
+        return self.call(name, version, arguments, ctx_members)
+
+    async def _acall_within(self, deadline, name, version, arguments,
+                            ctx_members):
+        """
+        Asynchronous variant of :meth:`._call_within`.
         """
-        responses = []
-        for r in requests:
-            name = r[0]
-            version = r[1]
-            args = r[2:]
-            success, result = self.call(
-                name, version, args, ctx_members=ctx_members)
-            responses.append({
-                'success': success,
-                'result': result,
-            })
-        return responses
+        rejected = self._over_budget(deadline, name, version)
+        if rejected is not None:
+            return rejected
+        return await self.acall(name, version, arguments, ctx_members)
+
+    def _response(self, success, result, binary, index=None):
+        """
+        Creates the response object of a single call for :meth:`.handle` and
+        its variants.
+        """
+        if index is None:
+            response = {'success': success, 'result': result}
+        else:
+            response = {'index': index, 'success': success, 'result': result}
+        if isinstance(result, Columns):
+            response['format'] = 'columns'
+            response['result'] = result.encode(binary)
+        return response
+
+    def _call_batch(self, calls, ctx_members, deadline=None):
+        """
+        Invokes all *calls* within a single context and returns a list of
+        ``(success, result)`` tuples, like the one returned by
+        :meth:`Endpoint.call`. A failure to set up or close the shared context
+        will be reported as the result of every call.
+
+        Batches involving coroutine functions are processed by
+        :meth:`._acall_batch` in a single event loop.
+        """
+        if any(self._has_coroutines(name, version)
+               for name, version, arguments in calls):
+            return _run(self._acall_batch(calls, ctx_members, deadline))
+        start = time.perf_counter_ns()
+        results = None
+        try:
+            with self.conf.ctx.Context() as ctx:
+                for member, value in ctx_members.items():
+                    setattr(ctx, member, value)
+                for preroute in self.preroutes:
+                    _resolve(preroute(ctx))
+                results = [
+                    self._over_budget(deadline, name, version) or
+                    self._profiled(
+                        name, version, arguments,
+                        self._call_scoped, ctx, name, version, arguments)
+                    for name, version, arguments in calls]
+        except Exception as e:
+            if results is None:
+                for name, version, arguments in calls:
+                    self._record_call(name, version, start, e)
+            return [(False, self._error_result(e))] * len(calls)
+        return results
+
+    async def _acall_batch(self, calls, ctx_members, deadline=None):
+        """
+        Asynchronous variant of :meth:`._call_batch`.
+        """
+        start = time.perf_counter_ns()
+        results = None
+        try:
+            with self.conf.ctx.Context() as ctx:
+                for member, value in ctx_members.items():
+                    setattr(ctx, member, value)
+                for preroute in self.preroutes:
+                    await _aresolve(preroute(ctx))
+                results = []
+                for name, version, arguments in calls:
+                    results.append(
+                        self._over_budget(deadline, name, version) or
+                        await self._acall_scoped(
+                            ctx, name, version, arguments))
+        except Exception as e:
+            if results is None:
+                for name, version, arguments in calls:
+                    self._record_call(name, version, start, e)
+            return [(False, self._error_result(e))] * len(calls)
+        return results
+
+    def _call_scoped(self, ctx, name, version, arguments):
+        """
+        Invokes a single call of a batch in the shared *ctx*, wrapped in the
+        scope created by the *batch_context* callable, if there is one.
+        """
+        start = time.perf_counter_ns()
+        try:
+            if callable(self.batch_context):
+                with self.batch_context(ctx):
+                    result = self._invoke(ctx, name, version, arguments)
+            else:
+                result = self._invoke(ctx, name, version, arguments)
+        except Exception as e:
+            self._record_call(name, version, start, e)
+            return False, self._error_result(e)
+        self._record_call(name, version, start)
+        return True, result
+
+    async def _acall_scoped(self, ctx, name, version, arguments):
+        """
+        Asynchronous variant of :meth:`._call_scoped`, that also accepts
+        asynchronous context managers as scopes.
+        """
+        start = time.perf_counter_ns()
+        try:
+            if not callable(self.batch_context):
+                result = await self._ainvoke(ctx, name, version, arguments)
+            else:
+                scope = self.batch_context(ctx)
+                if hasattr(scope, '__aenter__'):
+                    async with scope:
+                        result = await self._ainvoke(
+                            ctx, name, version, arguments)
+                else:
+                    with scope:
+                        result = await self._ainvoke(
+                            ctx, name, version, arguments)
+        except Exception as e:
+            self._record_call(name, version, start, e)
+            return False, self._error_result(e)
+        self._record_call(name, version, start)
+        return True, result
+
+    def _render_options_js(self):
+        options = collections.OrderedDict()
+        if self.streaming:
+            options['streaming'] = True
+        if self.timeout is not None:
+            options['timeout'] = int(self.timeout * 1000)
+        if self.binary:
+            options['binary'] = True
+        return json.dumps(options)
 
     def render_js(self, conf):
+        module, cls = self.transports[self.transport]
         if self.conf.js_format == 'umd':
             return self.umd_template % (
-                self.name, self._render_ops_js(), self.url, self.method)
+                module, module, cls, cls,
+                cls, self.name, self._render_ops_js(), self.url, self.method,
+                self._render_options_js())
         assert self.conf.js_format == 'es6'
         return self.es6_template % (
-            self.name,
-            self.name, self._render_ops_js(), self.url, self.method,
+            cls,
+            self.name, cls, self.name, self._render_ops_js(), self.url,
+            self.method,
+            self._render_options_js(),
             self.name)
 
 
@@ -428,3 +1210,10 @@ class SafeException(Exception):
         });
 
     """
+
+
+class BudgetExceeded(SafeException):
+    """
+    Raised for calls of a batch, that were not invoked, because the
+    *time_budget* of their :class:`.UrlEndpoint` was already spent.
+    """
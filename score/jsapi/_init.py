@@ -26,7 +26,7 @@
 # the Licensee has his registered seat, an establishment or assets.
 
 import abc
-import inspect
+import hashlib
 import json
 import logging
 import os
@@ -39,7 +39,11 @@ from score.init import (
 from score.tpl import TemplateNotFound
 from score.tpl.loader import Loader
 
-from ._endpoint import SafeException, UrlEndpoint
+from . import _compress
+from ._codec import JsonCodec, MsgpackCodec, parse_codec
+from ._endpoint import SafeException, UrlEndpoint, _run
+from ._metrics import Metrics
+from ._profile import Profiler
 
 log = logging.getLogger(__name__)
 
@@ -48,9 +52,21 @@ VALID_FORMATS = ('umd', 'es6')
 
 
 defaults = {
+    'codec': 'json',
     'endpoints': [],
     'expose': False,
+    'expose.depth': None,
+    'expose.source': True,
+    'js.bundle': False,
+    'js.compress': [],
     'js.format': 'umd',
+    'js.minify': False,
+    'metrics.url': None,
+    'profile.factory': None,
+    'profile.keep': 100,
+    'profile.outdir': None,
+    'profile.rate': 0,
+    'profile.threshold': None,
     'serve.outdir': None,
 }
 
@@ -64,6 +80,17 @@ def init(confdict, ctx, tpl, http):
         Optional single endpoint value that can be provided for convenience.
         See `endpoints`, below, for details.
 
+    :confkey:`codec` :confdefault:`json`
+        The codec for decoding requests and encoding responses of
+        :class:`UrlEndpoints <.UrlEndpoint>`. The default value uses python's
+        builtin :mod:`json` module, while "orjson" will use the much faster
+        orjson_ library, if it is installed. You can also provide a
+        :func:`dotted path <score.init.parse_dotted_path>` to your own codec
+        object, which must provide the same interface as
+        :class:`score.jsapi.JsonCodec`.
+
+        .. _orjson: https://github.com/ijl/orjson
+
     :confkey:`endpoints` :confdefault:`list()`
         A :func:`list <score.init.parse_list>` of :func:`dotted paths
         <score.init.parse_dotted_path>` pointing to any amount of
@@ -76,6 +103,66 @@ def init(confdict, ctx, tpl, http):
         switched to `True` during development to receive Exceptions and
         stacktraces in the browser console.
 
+    :confkey:`expose.source` :confdefault:`True`
+        Whether exposed stacktraces should contain the source code of each
+        line. Disabling this avoids reading the source files, which makes
+        error responses cheaper.
+
+    :confkey:`expose.depth` :confdefault:`None`
+        The maximum number of (innermost) frames of exposed stacktraces.
+
+    :confkey:`js.format` :confdefault:`umd`
+        The format of the generated javascript files, either "umd" or "es6".
+
+    :confkey:`js.bundle` :confdefault:`False`
+        Whether :meth:`ConfiguredJsapiModule.build` should concatenate all
+        javascript files into a single, self-contained ``jsapi.js``
+        instead of creating a tree of modules. Only available for the "umd"
+        format.
+
+    :confkey:`js.minify` :confdefault:`False`
+        Whether the bundle described above should be minified. This feature
+        requires the rjsmin_ package.
+
+        .. _rjsmin: https://pypi.org/project/rjsmin/
+
+    :confkey:`js.compress` :confdefault:`list()`
+        A :func:`list <score.init.parse_list>` of content encodings ("gzip"
+        and "br"), for which :meth:`ConfiguredJsapiModule.build` should write
+        pre-compressed siblings of every generated file (i.e. ``jsapi.js.gz``
+        and ``jsapi.js.br``), compressed with the highest level of each
+        encoding. Brotli compression requires the brotli_ package.
+
+        .. _brotli: https://pypi.org/project/Brotli/
+
+    :confkey:`metrics.url` :confdefault:`None`
+        An optional URL, where the :attr:`ConfiguredJsapiModule.metrics`
+        should be served in the text format of Prometheus_.
+
+        .. _Prometheus: https://prometheus.io/
+
+    :confkey:`profile.rate` :confdefault:`0`
+        The fraction of calls, that should be profiled (i.e. 0.01 to profile
+        one call out of a hundred). The collected profiles are available
+        through the :class:`.Profiler` in
+        :attr:`ConfiguredJsapiModule.profiler`, which will be `None` if this
+        value is 0.
+
+    :confkey:`profile.threshold` :confdefault:`None`
+        Minimum duration of a profiled call in seconds. Profiles of faster
+        calls are discarded.
+
+    :confkey:`profile.keep` :confdefault:`100`
+        Number of profiles to keep in memory.
+
+    :confkey:`profile.outdir` :confdefault:`None`
+        An optional folder, where every collected profile will be written to.
+
+    :confkey:`profile.factory` :confdefault:`None`
+        A :func:`dotted path <score.init.parse_dotted_path>` to a callable
+        creating the profiler for a single call. Defaults to
+        :class:`cProfile.Profile`.
+
     :confkey:`serve.outdir` :confdefault:`None`
         A folder, where this module's :mod:`score.serve` worker will dump all
         javascript files required to make use of this module in a javascript
@@ -88,14 +175,75 @@ def init(confdict, ctx, tpl, http):
     if 'endpoint' in conf:
         endpoints.append(parse_dotted_path(conf['endpoint']))
     expose = parse_bool(conf['expose'])
+    expose_source = parse_bool(conf['expose.source'])
+    expose_depth = conf['expose.depth']
+    if expose_depth is not None:
+        expose_depth = int(expose_depth)
     if conf['serve.outdir'] and not os.path.isdir(conf['serve.outdir']):
         raise ConfigurationError(
             'score.jsapi', 'Configured serve.outdir does not exist')
     if conf['js.format'] not in VALID_FORMATS:
         raise ConfigurationError(
             'score.jsapi', 'Invalid js.format "%s"' % (conf['js.format'],))
+    bundle = parse_bool(conf['js.bundle'])
+    if bundle and conf['js.format'] != 'umd':
+        raise ConfigurationError(
+            'score.jsapi', 'js.bundle is only available for js.format "umd"')
+    minify = parse_bool(conf['js.minify'])
+    if minify:
+        _import_rjsmin()
+    compress = parse_list(conf['js.compress'])
+    _check_encodings(compress)
+    codec = parse_codec(conf['codec'])
+    profiler = None
+    if float(conf['profile.rate']):
+        profiler = _parse_profiler(conf)
     return ConfiguredJsapiModule(ctx, tpl, http, endpoints, expose,
-                                 conf['js.format'], conf['serve.outdir'])
+                                 conf['js.format'], conf['serve.outdir'],
+                                 codec, bundle, minify, compress,
+                                 conf['metrics.url'], profiler,
+                                 expose_source, expose_depth)
+
+
+def _parse_profiler(conf):
+    outdir = conf['profile.outdir']
+    if outdir and not os.path.isdir(outdir):
+        raise ConfigurationError(
+            'score.jsapi', 'Configured profile.outdir does not exist')
+    threshold = conf['profile.threshold']
+    if threshold is not None:
+        threshold = float(threshold)
+    kwargs = {}
+    if conf['profile.factory']:
+        kwargs['factory'] = parse_dotted_path(conf['profile.factory'])
+    return Profiler(rate=float(conf['profile.rate']), threshold=threshold,
+                    maxsize=int(conf['profile.keep']), outdir=outdir or None,
+                    **kwargs)
+
+
+def _load_binary_codec():
+    try:
+        return MsgpackCodec()
+    except ImportError:
+        raise ConfigurationError(
+            'score.jsapi', 'Binary endpoints require msgpack')
+
+
+def _check_encodings(encodings):
+    for encoding in encodings:
+        if encoding not in _compress.available_encodings():
+            raise ConfigurationError(
+                'score.jsapi', 'Unsupported js.compress encoding "%s"' % (
+                    encoding,))
+
+
+def _import_rjsmin():
+    try:
+        import rjsmin
+    except ImportError:
+        raise ConfigurationError(
+            'score.jsapi', 'Minifying javascript requires rjsmin')
+    return rjsmin
 
 
 js_keywords = (
@@ -110,32 +258,221 @@ js_keywords = (
     'while', 'with', 'yield',)
 
 
+# members of the generated javascript api object, which cannot be used as
+# operation names
+jsapi_members = ('configure', 'invalidate', 'withSignal', 'withTimeout')
+
+
 def _make_api(endpoint):
-    def api(ctx):
-        if endpoint.method == "POST":
-            if ctx.http.request.content_type != 'application/json':
-                ctx.http.response.status = '400 Invalid Content-Type'
+    if endpoint.asynchronous:
+        # score.http invokes routes synchronously, so the route runs the
+        # batch in an event loop of its own
+        def api(ctx):
+            requests = _parse_requests(endpoint, ctx)
+            if requests is None:
                 return ctx.http.response
-            requests = json.loads(str(ctx.http.request.body,
-                                      ctx.http.request.charset))
-        else:
-            requests = map(json.loads,
-                           ctx.http.request.GET.getall('requests[]'))
-        ctx_members = {'http': ctx.http}
-        if endpoint.ctx_members:
-            if callable(endpoint.ctx_members):
-                ctx_members.update(endpoint.ctx_members(ctx))
-            else:
-                for member in endpoint.ctx_members:
-                    if hasattr(ctx, member):
-                        ctx_members[member] = getattr(ctx, member)
-        results = endpoint.handle(requests, ctx_members)
-        ctx.http.response.content_type = 'application/json; charset=UTF-8'
-        ctx.http.response.json = results
+            codec = _response_codec(endpoint, ctx)
+            results = _run(endpoint.ahandle(
+                requests, _collect_ctx_members(endpoint, ctx),
+                binary=codec is endpoint.conf.binary_codec))
+            return _respond(endpoint, ctx, requests, results, codec)
+    else:
+        def api(ctx):
+            requests = _parse_requests(endpoint, ctx)
+            if requests is None:
+                return ctx.http.response
+            ctx_members = _collect_ctx_members(endpoint, ctx)
+            if endpoint.streaming and _accepts_stream(ctx):
+                return _respond_stream(endpoint, ctx, requests, ctx_members)
+            codec = _response_codec(endpoint, ctx)
+            results = endpoint.handle(
+                requests, ctx_members,
+                binary=codec is endpoint.conf.binary_codec)
+            return _respond(endpoint, ctx, requests, results, codec)
+    return api
+
+
+def _make_metrics_api(metrics):
+    def api(ctx):
+        ctx.http.response.headers['Content-Type'] = \
+            'text/plain; version=0.0.4; charset=UTF-8'
+        ctx.http.response.body = metrics.render_prometheus().encode('UTF-8')
         return ctx.http.response
     return api
 
 
+def _accepts_stream(ctx):
+    accept = ctx.http.request.headers.get('Accept', '')
+    return 'application/x-ndjson' in accept
+
+
+def _parse_requests(endpoint, ctx):
+    """
+    Extracts the list of calls from the current request. Will return `None` if
+    the request was invalid, after updating the response accordingly.
+    """
+    if endpoint.max_body_size is not None:
+        if _request_size(endpoint, ctx) > endpoint.max_body_size:
+            ctx.http.response.status = '413 Request Entity Too Large'
+            return None
+    requests = _decode_requests(endpoint, ctx)
+    if requests is None:
+        return None
+    if endpoint.max_batch_size is not None:
+        if len(requests) > endpoint.max_batch_size:
+            ctx.http.response.status = '413 Batch Too Large'
+            return None
+    return requests
+
+
+def _decode_requests(endpoint, ctx):
+    codec = endpoint.conf.codec
+    if endpoint.method == "POST":
+        content_type = ctx.http.request.content_type
+        if endpoint.binary and \
+                content_type in endpoint.conf.binary_codec.content_types:
+            return endpoint.conf.binary_codec.loads(ctx.http.request.body)
+        if content_type != 'application/json':
+            ctx.http.response.status = '400 Invalid Content-Type'
+            return None
+        body = ctx.http.request.body
+        charset = ctx.http.request.charset
+        if charset and charset.lower() not in ('utf-8', 'utf8'):
+            body = str(body, charset)
+        return codec.loads(body)
+    return [codec.loads(request)
+            for request in ctx.http.request.GET.getall('requests[]')]
+
+
+def _collect_ctx_members(endpoint, ctx):
+    ctx_members = {'http': ctx.http}
+    if endpoint.ctx_members:
+        if callable(endpoint.ctx_members):
+            ctx_members.update(endpoint.ctx_members(ctx))
+        else:
+            for member in endpoint.ctx_members:
+                if hasattr(ctx, member):
+                    ctx_members[member] = getattr(ctx, member)
+    return ctx_members
+
+
+def _request_size(endpoint, ctx):
+    if endpoint.method == 'POST':
+        # prefer the declared length, which does not require reading the body
+        if ctx.http.request.content_length is not None:
+            return ctx.http.request.content_length
+        return len(ctx.http.request.body)
+    return len(ctx.http.request.query_string)
+
+
+def _response_codec(endpoint, ctx):
+    """
+    Returns the binary codec, if the endpoint supports it and the client
+    accepts it, or the configured json codec.
+    """
+    if endpoint.binary:
+        accept = ctx.http.request.headers.get('Accept', '')
+        for content_type in endpoint.conf.binary_codec.content_types:
+            if content_type in accept:
+                return endpoint.conf.binary_codec
+    return endpoint.conf.codec
+
+
+def _add_vary(ctx, header):
+    vary = tuple(ctx.http.response.vary or ())
+    if header not in vary:
+        ctx.http.response.vary = vary + (header,)
+
+
+def _respond(endpoint, ctx, requests, results, codec):
+    body = codec.dumps(results)
+    if endpoint.binary:
+        _add_vary(ctx, 'Accept')
+    if endpoint.compress_threshold is not None:
+        _add_vary(ctx, 'Accept-Encoding')
+    if endpoint.method == 'GET':
+        if _set_cache_headers(endpoint, ctx, requests, results, body):
+            ctx.http.response.status = '304 Not Modified'
+            del ctx.http.response.content_type
+            endpoint.conf.metrics.record_batch(
+                endpoint.name, len(requests), _request_size(endpoint, ctx), 0)
+            return ctx.http.response
+    if codec is endpoint.conf.binary_codec:
+        ctx.http.response.content_type = codec.content_type
+    else:
+        ctx.http.response.content_type = \
+            codec.content_type + '; charset=UTF-8'
+    if endpoint.compress_threshold is not None:
+        if len(body) >= endpoint.compress_threshold:
+            encoding = _compress.negotiate(
+                ctx.http.request.headers.get('Accept-Encoding'))
+            if encoding:
+                body = _compress.compress(
+                    body, encoding, endpoint.compress_level)
+                ctx.http.response.content_encoding = encoding
+    endpoint.conf.metrics.record_batch(
+        endpoint.name, len(requests), _request_size(endpoint, ctx), len(body))
+    ctx.http.response.body = body
+    return ctx.http.response
+
+
+def _respond_stream(endpoint, ctx, requests, ctx_members):
+    """
+    Sends the results as newline-delimited json as soon as they become
+    available. Note that the calls are processed while the response body is
+    being sent, i.e. after the route has returned.
+    """
+    codec = endpoint.conf.codec
+    request_size = _request_size(endpoint, ctx)
+
+    def generate():
+        response_size = 0
+        for response in endpoint.handle_iter(requests, ctx_members):
+            line = codec.dumps(response) + b'\n'
+            response_size += len(line)
+            yield line
+        endpoint.conf.metrics.record_batch(
+            endpoint.name, len(requests), request_size, response_size)
+    ctx.http.response.content_type = 'application/x-ndjson; charset=UTF-8'
+    ctx.http.response.app_iter = generate()
+    return ctx.http.response
+
+
+def _set_cache_headers(endpoint, ctx, requests, results, body):
+    """
+    Adds an *ETag* and -- if all requested operations declared a *max_age* --
+    a *Cache-Control* header to the response of a successful GET request.
+    Returns whether the client already has the current representation
+    according to its *If-None-Match* header.
+    """
+    if not all(result['success'] for result in results):
+        return False
+    max_age, public = None, True
+    for request in requests:
+        operation = endpoint.ops[(request[0], request[1])]
+        if operation.score_jsapi_op_max_age is None:
+            max_age = None
+            break
+        if max_age is None or operation.score_jsapi_op_max_age < max_age:
+            max_age = operation.score_jsapi_op_max_age
+        public = public and operation.score_jsapi_op_public
+    if max_age is not None:
+        ctx.http.response.cache_control = '%s, max-age=%d' % (
+            'public' if public else 'private', max_age)
+    etag = '"%s"' % hashlib.sha1(body).hexdigest()
+    ctx.http.response.headers['ETag'] = 'W/' + etag
+    if_none_match = ctx.http.request.headers.get('If-None-Match')
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate in (etag, '*'):
+            return True
+    return False
+
+
 class JsapiTemplateLoader(Loader):
 
     _exceptions_map = None
@@ -213,6 +550,9 @@ class JsapiUmdTemplateLoader(JsapiTemplateLoader):
                 // only CommonJS-like environments that support module.exports,
                 // like Node.
                 module.exports = factory(%s);
+            } else {
+                // Browser globals (root is window)
+                factory(root.score.jsapi.unified);
             }
         })(this, function(UnifiedApi) {
 
@@ -236,6 +576,9 @@ class JsapiUmdTemplateLoader(JsapiTemplateLoader):
                 // only CommonJS-like environments that support module.exports,
                 // like Node.
                 module.exports = factory(require('./exception'));
+            } else {
+                // Browser globals (root is window)
+                factory(root.score.jsapi.Exception);
             }
         })(this, function(Exception) {
 
@@ -248,6 +591,54 @@ class JsapiUmdTemplateLoader(JsapiTemplateLoader):
         });
     ''').lstrip()
 
+    bundle_template = textwrap.dedent('''
+        /* eslint-disable */
+        /* tslint:disable */
+        // Universal Module Loader
+        // https://github.com/umdjs/umd
+        // https://github.com/umdjs/umd/blob/v1.0.0/returnExports.js
+        (function (root, factory) {
+            if (typeof define === 'function' && define.amd) {
+                // AMD. Register as an anonymous module.
+                define([], factory);
+            } else if (typeof module === 'object' && module.exports) {
+                // Node. Does not work with strict CommonJS, but
+                // only CommonJS-like environments that support module.exports,
+                // like Node.
+                module.exports = factory();
+            } else {
+                // Browser globals (root is window)
+                root.score = root.score || {};
+                root.score.jsapi = root.score.jsapi || {};
+                root.score.jsapi.unified = factory();
+            }
+        })(this, function() {
+
+            // All bundled modules register themselves in this private scope
+            // through their "browser globals" branch.
+            var scope = {};
+
+            (function(define, module, require) {
+
+        %s
+
+            }).call(scope);
+
+            return scope.score.jsapi.unified;
+
+        });
+    ''').lstrip()
+
+    def render_bundle(self):
+        """
+        Renders all javascript files into a single, self-contained module,
+        that can be loaded via AMD, CommonJS or as a plain script.
+        """
+        modules = [self.conf.tpl.render(path)
+                   for path in self.iter_paths()
+                   if path != 'score/jsapi.js']
+        return self.bundle_template % ('\n'.join(modules),)
+
     def render_jsapi(self):
         dependencies = ['./jsapi/unified', './jsapi/exceptions'] + [
             './jsapi/endpoints/%s' % name
@@ -338,14 +729,29 @@ class ConfiguredJsapiModule(ConfiguredModule):
     """
 
     def __init__(self, ctx, tpl, http, endpoints, expose,
-                 js_format, serve_outdir):
+                 js_format, serve_outdir, codec=None, bundle=False,
+                 minify=False, compress=(), metrics_url=None, profiler=None,
+                 expose_source=True, expose_depth=None):
         super().__init__(__package__)
         self.ctx = ctx
         self.tpl = tpl
         self.http = http
         self.expose = expose
+        self.expose_source = expose_source
+        self.expose_depth = expose_depth
+        self.codec = codec if codec is not None else JsonCodec()
         self.js_format = js_format
         self.serve_outdir = serve_outdir
+        self.bundle = bundle
+        self.minify = minify
+        self.compress = compress
+        self._build_digests = {}
+        self.binary_codec = None
+        self.metrics = Metrics()
+        self.profiler = profiler
+        if metrics_url:
+            self.http.newroute('score.jsapi.metrics', metrics_url)(
+                _make_metrics_api(self.metrics))
         self.endpoints = OrderedDict()
         for endpoint in endpoints:
             self.add_endpoint(endpoint)
@@ -355,23 +761,35 @@ class ConfiguredJsapiModule(ConfiguredModule):
             self.tpl_loader = JsapiEs6TemplateLoader(self)
         tpl.loaders['js'].append(self.tpl_loader)
 
+    def _finalize(self):
+        for endpoint in self.endpoints.values():
+            endpoint.finalize()
+
     def add_endpoint(self, endpoint):
         assert not self._finalized
-        for funcname in endpoint.ops:
+        for (funcname, version), func in endpoint.ops.items():
             if funcname in js_keywords:
                 raise ConfigurationError(
                     __package__,
                     'Exposed function `%s\'s name is '
                     'a reserved keyword in javascript' %
                     funcname)
-            func = endpoint.ops[funcname]
-            for name in inspect.signature(func).parameters:
+            if funcname in jsapi_members:
+                raise ConfigurationError(
+                    __package__,
+                    'Exposed function `%s\'s name is '
+                    'reserved by the javascript api' %
+                    funcname)
+            for name in func.score_jsapi_op_signature.parameters:
                 if name in js_keywords:
                     raise ConfigurationError(
                         __package__,
                         'Exposed function `%s\' has parameter `%s\', which is '
                         'a reserved keyword in javascript' %
                         (funcname, name))
+        if isinstance(endpoint, UrlEndpoint) and endpoint.binary:
+            if self.binary_codec is None:
+                self.binary_codec = _load_binary_codec()
         self.endpoints[endpoint.name] = endpoint
         endpoint.conf = self
         if isinstance(endpoint, UrlEndpoint):
@@ -391,13 +809,106 @@ class ConfiguredJsapiModule(ConfiguredModule):
                 self.conf = conf
 
             def loop(self):
-                self.conf.build(self.conf.serve_outdir)
+                for file in self.conf.build(self.conf.serve_outdir):
+                    log.info('Updated %s', file)
 
         return {'watcher': Worker(self)}
 
-    def build(self, target_folder):
+    def build(self, target_folder, *, bundle=None, minify=None,
+              compress=None):
+        """
+        Renders all javascript files into given *target_folder* and returns
+        the `list` of files that were actually written.
+
+        Files, whose content did not change since the last build, are left
+        untouched to avoid triggering file system watchers. Changed files are
+        replaced atomically.
+
+        If *bundle* is `True`, all files will be concatenated into a single
+        file called ``jsapi.js``, which will be minified if *minify* is `True`
+        as well. Both values default to the configured `js.bundle` and
+        `js.minify` values.
+
+        The optional *compress* parameter is a list of content encodings, for
+        which pre-compressed siblings of each file should be written. It
+        defaults to the configured `js.compress` value. Files are only
+        compressed again, if their content changed. A
+        :class:`score.init.ConfigurationError` is raised for encodings, that
+        are not available in the current environment.
+        """
+        if bundle is None:
+            bundle = self.bundle
+        if minify is None:
+            minify = self.minify
+        if compress is None:
+            compress = self.compress
+        else:
+            _check_encodings(compress)
+        if bundle:
+            files = self._render_bundle(target_folder, minify)
+        else:
+            files = self._render_files(target_folder)
+        changed = []
+        for file, content in files:
+            written = self._write_file(file, content)
+            if written:
+                changed.append(file)
+            for encoding in compress:
+                sibling = file + _compress.extension(encoding)
+                if not written and os.path.exists(sibling):
+                    continue
+                compressed = _compress.compress(
+                    content, encoding, level=_compress.max_level(encoding))
+                if self._write_file(sibling, compressed):
+                    changed.append(sibling)
+        return changed
+
+    def _render_files(self, target_folder):
         for path in self.tpl_loader.iter_paths():
             reduced_path = path[len('score/'):]
             file = os.path.join(target_folder, reduced_path)
-            os.makedirs(os.path.dirname(file), exist_ok=True)
-            open(file, 'w').write(self.tpl.render(path))
+            yield file, self.tpl.render(path).encode('UTF-8')
+
+    def _render_bundle(self, target_folder, minify):
+        if self.js_format != 'umd':
+            raise ConfigurationError(
+                'score.jsapi',
+                'Bundles are only available for js.format "umd"')
+        content = self.tpl_loader.render_bundle()
+        if minify:
+            content = _import_rjsmin().jsmin(content)
+        file = os.path.join(target_folder, 'jsapi.js')
+        yield file, content.encode('UTF-8')
+
+    def _write_file(self, file, content):
+        """
+        Writes *content* into given *file*, unless it already contains the
+        exact same data. Returns whether the file was written.
+        """
+        digest = hashlib.sha1(content).digest()
+        try:
+            stat = os.stat(file)
+        except FileNotFoundError:
+            pass
+        else:
+            fingerprint = (stat.st_mtime_ns, stat.st_size)
+            known = self._build_digests.get(file)
+            if known is None or known[0] != fingerprint:
+                with open(file, 'rb') as fp:
+                    known = (fingerprint, hashlib.sha1(fp.read()).digest())
+                self._build_digests[file] = known
+            if known[1] == digest:
+                return False
+        os.makedirs(os.path.dirname(file), exist_ok=True)
+        tmpfile = '%s.%d.tmp' % (file, os.getpid())
+        try:
+            with open(tmpfile, 'wb') as fp:
+                fp.write(content)
+            os.replace(tmpfile, file)
+        except Exception:
+            if os.path.exists(tmpfile):
+                os.unlink(tmpfile)
+            raise
+        stat = os.stat(file)
+        self._build_digests[file] = ((stat.st_mtime_ns, stat.st_size), digest)
+        return True
@@ -0,0 +1,181 @@
+# Copyright © 2015-2018 STRG.AT GmbH, Vienna, Austria
+# Copyright © 2018-2020 Necdet Can Ateşman <can@atesman.at>, Vienna, Austria
+#
+# This file is part of the The SCORE Framework.
+#
+# The SCORE Framework and all its parts are free software: you can redistribute
+# them and/or modify them under the terms of the GNU Lesser General Public
+# License version 3 as published by the Free Software Foundation which is in
+# the file named COPYING.LESSER.txt.
+#
+# The SCORE Framework and all its parts are distributed without any WARRANTY;
+# without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. For more details see the GNU Lesser General Public
+# License.
+#
+# If you have not received a copy of the GNU Lesser General Public License see
+# http://www.gnu.org/licenses/.
+#
+# The License-Agreement realised between you as Licensee and STRG.AT GmbH as
+# Licenser including the issue of its valid conclusion and its pre- and
+# post-contractual effects is governed by the laws of Austria. Any disputes
+# concerning this License-Agreement including the issue of its valid conclusion
+# and its pre- and post-contractual effects are exclusively decided by the
+# competent court, in whose district STRG.AT GmbH has its registered seat, at
+# the discretion of STRG.AT GmbH also the competent court, in whose district
+# the Licensee has his registered seat, an establishment or assets.
+
+
+import collections
+import contextlib
+import threading
+import time
+
+from ._endpoint import SafeException
+
+
+class RateLimitExceeded(SafeException):
+    """
+    Raised for calls rejected by a :class:`.Limiter`. The attribute
+    :attr:`retry_after` contains the number of seconds, after which the call
+    may succeed, or `None` if the call was rejected due to too many concurrent
+    executions. The value is also available in javascript as the property
+    ``retryAfter`` of the rejected exception.
+    """
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class Limiter:
+    """
+    Limits the number of calls to operations, which can be passed to
+    :meth:`.Endpoint.op` or to the constructor of a :class:`.UrlEndpoint`
+    to limit all of its operations:
+
+    .. code-block:: python
+
+        @endpoint.op(limit=Limiter(rate=2, burst=10, concurrency=4,
+                                   key=lambda ctx: ctx.user.id))
+        def search(ctx, query):
+            return ctx.search.query(query)
+
+    The *rate* is the number of calls per second, that will be granted in the
+    long run, while *burst* is the number of calls, that may be made at once
+    after a period of inactivity (the size of the token bucket, which defaults
+    to the *rate*, or at least 1). The *concurrency* limits the number of
+    invocations running at the same time. Calls exceeding any of these limits
+    fail with a :class:`.RateLimitExceeded` exception.
+
+    The limits are applied per value of the optional *key* callable, which
+    receives the :class:`score.ctx.Context` of the call and must return a
+    hashable value, like the id of the current user or the IP address of the
+    client. Without a *key*, the limits apply to all calls together.
+
+    The state is kept in a :class:`MemoryBackend` by default, which is only
+    shared within the current process. A *backend* shared between processes
+    (on top of redis, for example) must provide the same methods. Limiters
+    sharing such a backend must be given distinct *name* values.
+
+    A single Limiter object may be shared by multiple operations, which will
+    then share the same limits.
+    """
+
+    def __init__(self, *, rate=None, burst=None, concurrency=None, key=None,
+                 backend=None, name=None):
+        if rate is None and concurrency is None:
+            raise ValueError('Limiter requires a rate or a concurrency')
+        if burst is None and rate is not None:
+            burst = max(1, rate)
+        self.rate = rate
+        self.burst = burst
+        self.concurrency = concurrency
+        self.key = key
+        self.backend = backend if backend is not None else MemoryBackend()
+        self.name = name
+
+    def make_key(self, ctx):
+        """
+        Generates the backend key for a call in given *ctx*.
+        """
+        if self.key is None:
+            return (self.name, None)
+        return (self.name, self.key(ctx))
+
+    @contextlib.contextmanager
+    def acquire(self, ctx):
+        """
+        Context manager wrapping a single invocation in given *ctx*. Raises
+        :class:`.RateLimitExceeded` if the invocation exceeds the limits.
+        """
+        key = self.make_key(ctx)
+        if self.concurrency is not None:
+            if not self.backend.enter(key, self.concurrency):
+                raise RateLimitExceeded('Too many concurrent calls')
+        try:
+            if self.rate is not None:
+                wait = self.backend.take(key, self.rate, self.burst)
+                if wait:
+                    raise RateLimitExceeded(
+                        'Rate limit exceeded, retry in %.3gs' % wait, wait)
+            yield
+        finally:
+            if self.concurrency is not None:
+                self.backend.leave(key)
+
+
+class MemoryBackend:
+    """
+    The default backend of a :class:`.Limiter`, which keeps its state in the
+    memory of the current process. Once there are more than *maxsize* token
+    buckets, the least recently used ones are discarded.
+    """
+
+    def __init__(self, *, maxsize=10000):
+        self.maxsize = maxsize
+        self._buckets = collections.OrderedDict()
+        self._running = {}
+        self._lock = threading.Lock()
+
+    def take(self, key, rate, burst):
+        """
+        Takes a token from the bucket of given *key*, which is refilled with
+        *rate* tokens per second up to a total of *burst* tokens. Returns 0 on
+        success, or the number of seconds until the next token is available.
+        """
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (burst, now))
+            tokens = min(burst, tokens + (now - updated) * rate)
+            if tokens < 1:
+                wait = (1 - tokens) / rate
+            else:
+                wait = 0
+                tokens -= 1
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            if len(self._buckets) > self.maxsize:
+                self._buckets.popitem(last=False)
+        return wait
+
+    def enter(self, key, limit):
+        """
+        Registers the start of an invocation for given *key*. Returns whether
+        fewer than *limit* invocations were running.
+        """
+        with self._lock:
+            running = self._running.get(key, 0)
+            if running >= limit:
+                return False
+            self._running[key] = running + 1
+        return True
+
+    def leave(self, key):
+        """
+        Registers the end of an invocation started with :meth:`enter`.
+        """
+        with self._lock:
+            running = self._running.pop(key) - 1
+            if running:
+                self._running[key] = running
@@ -0,0 +1,295 @@
+# Copyright © 2015-2018 STRG.AT GmbH, Vienna, Austria
+# Copyright © 2018-2020 Necdet Can Ateşman <can@atesman.at>, Vienna, Austria
+#
+# This file is part of the The SCORE Framework.
+#
+# The SCORE Framework and all its parts are free software: you can redistribute
+# them and/or modify them under the terms of the GNU Lesser General Public
+# License version 3 as published by the Free Software Foundation which is in
+# the file named COPYING.LESSER.txt.
+#
+# The SCORE Framework and all its parts are distributed without any WARRANTY;
+# without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. For more details see the GNU Lesser General Public
+# License.
+#
+# If you have not received a copy of the GNU Lesser General Public License see
+# http://www.gnu.org/licenses/.
+#
+# The License-Agreement realised between you as Licensee and STRG.AT GmbH as
+# Licenser including the issue of its valid conclusion and its pre- and
+# post-contractual effects is governed by the laws of Austria. Any disputes
+# concerning this License-Agreement including the issue of its valid conclusion
+# and its pre- and post-contractual effects are exclusively decided by the
+# competent court, in whose district STRG.AT GmbH has its registered seat, at
+# the discretion of STRG.AT GmbH also the competent court, in whose district
+# the Licensee has his registered seat, an establishment or assets.
+
+
+import bisect
+import collections
+import threading
+
+from ._endpoint import SafeException
+
+
+# upper bounds of the latency buckets in nanoseconds
+LATENCY_BUCKETS = tuple(int(ms * 1000000) for ms in (
+    0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000))
+
+BATCH_SIZE_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+BYTES_BUCKETS = (
+    256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+
+class Histogram:
+    """
+    A histogram with fixed buckets. The value at position *i* of :attr:`counts`
+    is the number of observed values, that were less than or equal to the
+    bound at position *i* of :attr:`bounds` (but greater than the previous
+    bound). The last entry of :attr:`counts` contains all values exceeding the
+    greatest bound.
+    """
+
+    __slots__ = ('bounds', 'counts', 'sum', 'count')
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        """
+        Generates tuples of bucket bounds and the number of observations less
+        than or equal to that bound. The bound of the last bucket is `None`.
+        """
+        total = 0
+        for bound, count in zip(self.bounds + (None,), self.counts):
+            total += count
+            yield bound, total
+
+    def copy(self):
+        histogram = Histogram(self.bounds)
+        histogram.counts = list(self.counts)
+        histogram.sum = self.sum
+        histogram.count = self.count
+        return histogram
+
+
+class OperationMetrics:
+    """
+    Counters of a single operation version: The number of :attr:`calls`, the
+    number of calls failing with a :class:`.SafeException`
+    (:attr:`safe_errors`) or any other exception (:attr:`unexpected_errors`)
+    and a :class:`Histogram` of call durations in nanoseconds
+    (:attr:`latency`).
+    """
+
+    __slots__ = ('calls', 'safe_errors', 'unexpected_errors', 'latency')
+
+    def __init__(self):
+        self.calls = 0
+        self.safe_errors = 0
+        self.unexpected_errors = 0
+        self.latency = Histogram(LATENCY_BUCKETS)
+
+    def copy(self):
+        metrics = OperationMetrics()
+        metrics.calls = self.calls
+        metrics.safe_errors = self.safe_errors
+        metrics.unexpected_errors = self.unexpected_errors
+        metrics.latency = self.latency.copy()
+        return metrics
+
+
+class BatchMetrics:
+    """
+    Histograms of the batches received by a :class:`.UrlEndpoint`: The number
+    of calls per batch (:attr:`size`) and the sizes of request and response
+    bodies in bytes (:attr:`request_bytes` and :attr:`response_bytes`).
+    """
+
+    __slots__ = ('size', 'request_bytes', 'response_bytes')
+
+    def __init__(self):
+        self.size = Histogram(BATCH_SIZE_BUCKETS)
+        self.request_bytes = Histogram(BYTES_BUCKETS)
+        self.response_bytes = Histogram(BYTES_BUCKETS)
+
+    def copy(self):
+        metrics = BatchMetrics()
+        metrics.size = self.size.copy()
+        metrics.request_bytes = self.request_bytes.copy()
+        metrics.response_bytes = self.response_bytes.copy()
+        return metrics
+
+
+class Metrics:
+    """
+    Collects statistics about all calls handled by the endpoints of a
+    :class:`.ConfiguredJsapiModule`, which are available as its
+    :attr:`metrics <.ConfiguredJsapiModule.metrics>` attribute:
+
+    .. code-block:: python
+
+        >>> metrics = score.jsapi.metrics.snapshot()
+        >>> add = metrics['operations'][('math', 'add', '')]
+        >>> add.calls, add.unexpected_errors, add.latency.sum / add.calls
+        (1024, 3, 52771.3)
+
+    Calls to operations, that do not exist, are counted under the operation
+    name "(unknown)" and an empty version.
+
+    See :meth:`render_prometheus` for exporting the data to a monitoring
+    system.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """
+        Discards all collected data.
+        """
+        with self._lock:
+            self._operations = collections.OrderedDict()
+            self._batches = collections.OrderedDict()
+
+    def record_call(self, endpoint, name, version, duration, exception=None):
+        """
+        Records a call to the operation *name* in given *version* of the
+        *endpoint*, that took *duration* nanoseconds. The *exception* is the
+        error raised by the call, if it failed.
+        """
+        key = (endpoint, name, version)
+        with self._lock:
+            try:
+                metrics = self._operations[key]
+            except KeyError:
+                metrics = self._operations[key] = OperationMetrics()
+            metrics.calls += 1
+            if exception is None:
+                pass
+            elif isinstance(exception, SafeException):
+                metrics.safe_errors += 1
+            else:
+                metrics.unexpected_errors += 1
+            metrics.latency.observe(duration)
+
+    def record_batch(self, endpoint, size, request_bytes, response_bytes):
+        """
+        Records a batch of *size* calls received by the *endpoint*. The other
+        parameters are the sizes of the request and response bodies.
+        """
+        with self._lock:
+            try:
+                metrics = self._batches[endpoint]
+            except KeyError:
+                metrics = self._batches[endpoint] = BatchMetrics()
+            metrics.size.observe(size)
+            metrics.request_bytes.observe(request_bytes)
+            metrics.response_bytes.observe(response_bytes)
+
+    def snapshot(self):
+        """
+        Returns a copy of the current data as a `dict` with two keys:
+
+        - "operations" maps tuples of endpoint name, operation name and version
+          to :class:`OperationMetrics`.
+        - "batches" maps endpoint names to :class:`BatchMetrics`.
+        """
+        with self._lock:
+            return {
+                'operations': collections.OrderedDict(
+                    (key, metrics.copy())
+                    for key, metrics in self._operations.items()),
+                'batches': collections.OrderedDict(
+                    (key, metrics.copy())
+                    for key, metrics in self._batches.items()),
+            }
+
+    def render_prometheus(self):
+        """
+        Renders the current data in the text-based exposition format of
+        Prometheus_. Durations are converted to seconds.
+
+        .. _Prometheus: https://prometheus.io/
+        """
+        snapshot = self.snapshot()
+        lines = []
+
+        def header(name, type, help):
+            lines.append('# HELP %s %s' % (name, help))
+            lines.append('# TYPE %s %s' % (name, type))
+
+        def histogram(name, labels, histogram, scale=1):
+            for bound, count in histogram.cumulative():
+                le = '+Inf' if bound is None else _format_number(bound / scale)
+                lines.append('%s_bucket%s %d' % (
+                    name, _format_labels(labels + (('le', le),)), count))
+            lines.append('%s_sum%s %s' % (
+                name, _format_labels(labels),
+                _format_number(histogram.sum / scale)))
+            lines.append('%s_count%s %d' % (
+                name, _format_labels(labels), histogram.count))
+
+        operations = [
+            ((('endpoint', endpoint), ('operation', name),
+              ('version', version)), metrics)
+            for (endpoint, name, version), metrics
+            in snapshot['operations'].items()]
+        header('score_jsapi_calls_total', 'counter',
+               'Number of handled calls.')
+        for labels, metrics in operations:
+            lines.append('score_jsapi_calls_total%s %d' % (
+                _format_labels(labels), metrics.calls))
+        header('score_jsapi_errors_total', 'counter',
+               'Number of failed calls.')
+        for labels, metrics in operations:
+            lines.append('score_jsapi_errors_total%s %d' % (
+                _format_labels(labels + (('kind', 'safe'),)),
+                metrics.safe_errors))
+            lines.append('score_jsapi_errors_total%s %d' % (
+                _format_labels(labels + (('kind', 'unexpected'),)),
+                metrics.unexpected_errors))
+        header('score_jsapi_call_duration_seconds', 'histogram',
+               'Duration of calls in seconds.')
+        for labels, metrics in operations:
+            histogram('score_jsapi_call_duration_seconds', labels,
+                      metrics.latency, 1e9)
+        batches = [((('endpoint', endpoint),), metrics)
+                   for endpoint, metrics in snapshot['batches'].items()]
+        header('score_jsapi_batch_size', 'histogram',
+               'Number of calls per request.')
+        for labels, metrics in batches:
+            histogram('score_jsapi_batch_size', labels, metrics.size)
+        header('score_jsapi_request_bytes', 'histogram',
+               'Size of request bodies in bytes.')
+        for labels, metrics in batches:
+            histogram('score_jsapi_request_bytes', labels,
+                      metrics.request_bytes)
+        header('score_jsapi_response_bytes', 'histogram',
+               'Size of response bodies in bytes.')
+        for labels, metrics in batches:
+            histogram('score_jsapi_response_bytes', labels,
+                      metrics.response_bytes)
+        return '\n'.join(lines) + '\n'
+
+
+def _format_labels(labels):
+    return '{%s}' % ','.join(
+        '%s="%s"' % (name, str(value).replace('\\', '\\\\')
+                     .replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in labels)
+
+
+def _format_number(value):
+    return repr(float(value))
@@ -0,0 +1,187 @@
+# Copyright © 2015-2018 STRG.AT GmbH, Vienna, Austria
+# Copyright © 2018-2020 Necdet Can Ateşman <can@atesman.at>, Vienna, Austria
+#
+# This file is part of the The SCORE Framework.
+#
+# The SCORE Framework and all its parts are free software: you can redistribute
+# them and/or modify them under the terms of the GNU Lesser General Public
+# License version 3 as published by the Free Software Foundation which is in
+# the file named COPYING.LESSER.txt.
+#
+# The SCORE Framework and all its parts are distributed without any WARRANTY;
+# without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. For more details see the GNU Lesser General Public
+# License.
+#
+# If you have not received a copy of the GNU Lesser General Public License see
+# http://www.gnu.org/licenses/.
+#
+# The License-Agreement realised between you as Licensee and STRG.AT GmbH as
+# Licenser including the issue of its valid conclusion and its pre- and
+# post-contractual effects is governed by the laws of Austria. Any disputes
+# concerning this License-Agreement including the issue of its valid conclusion
+# and its pre- and post-contractual effects are exclusively decided by the
+# competent court, in whose district STRG.AT GmbH has its registered seat, at
+# the discretion of STRG.AT GmbH also the competent court, in whose district
+# the Licensee has his registered seat, an establishment or assets.
+
+
+import collections
+import cProfile
+import hashlib
+import logging
+import os
+import pstats
+import random
+import re
+import threading
+import time
+
+from ._cache import _canonical_key
+
+log = logging.getLogger('score.jsapi')
+
+_unsafe_filename_chars = re.compile(r'[^A-Za-z0-9_-]')
+
+
+class ProfileRecord:
+    """
+    The profile of a single call, as collected by a :class:`Profiler`. The
+    call is described by the names of the :attr:`endpoint` and the operation
+    (:attr:`name`), its :attr:`version` and the :attr:`args_hash`, which is
+    the same for all calls with identical arguments. The :attr:`duration` of
+    the call is given in nanoseconds, the :attr:`timestamp` in seconds since
+    the epoch.
+    """
+
+    __slots__ = ('endpoint', 'name', 'version', 'args_hash', 'duration',
+                 'timestamp', 'profile')
+
+    def __init__(self, endpoint, name, version, args_hash, duration,
+                 timestamp, profile):
+        self.endpoint = endpoint
+        self.name = name
+        self.version = version
+        self.args_hash = args_hash
+        self.duration = duration
+        self.timestamp = timestamp
+        self.profile = profile
+
+    def __repr__(self):
+        return '<ProfileRecord %s>' % (self.filename,)
+
+    @property
+    def filename(self):
+        """
+        The name of the file, that will be written to the *outdir* of the
+        :class:`Profiler`. Characters, that are not allowed in portable file
+        names, are replaced with underscores.
+        """
+        parts = [self.endpoint, self.name]
+        if self.version:
+            parts.append(str(self.version))
+        parts = [_unsafe_filename_chars.sub('_', part) for part in parts]
+        parts.append(self.args_hash)
+        parts.append('%d' % (self.timestamp * 1000))
+        return '.'.join(parts) + '.prof'
+
+    def stats(self):
+        """
+        Returns the :class:`pstats.Stats` of the profile.
+        """
+        return pstats.Stats(self.profile)
+
+
+class Profiler:
+    """
+    Profiles a random sample of operation calls. Each call is profiled with a
+    probability of *rate* (a value between 0 and 1) and the resulting
+    :class:`ProfileRecord` is kept if the call took at least *threshold*
+    seconds, or in any case if no *threshold* was given. Note that every
+    profiled call is slowed down considerably, so the *rate* should be low
+    in production.
+
+    The last *maxsize* records are available as :attr:`records`. If an
+    *outdir* is given, every record will additionally be written to a file in
+    that folder, which can be inspected with :mod:`pstats` or any compatible
+    tool.
+
+    The *factory* creates the profiler for a single call. It defaults to
+    :class:`cProfile.Profile` and must return an object with the same
+    ``enable``, ``disable`` and ``dump_stats`` methods.
+
+    Only calls dispatched synchronously are profiled, since the profile of a
+    coroutine would also contain all other tasks running on its event loop.
+    """
+
+    def __init__(self, *, rate=1.0, threshold=None, maxsize=100, outdir=None,
+                 factory=cProfile.Profile):
+        self.rate = rate
+        self.threshold = threshold
+        self.maxsize = maxsize
+        self.outdir = outdir
+        self.factory = factory
+        self._records = collections.deque(maxlen=maxsize)
+        self._lock = threading.Lock()
+
+    @property
+    def records(self):
+        """
+        A `list` of the collected :class:`ProfileRecords <ProfileRecord>`,
+        oldest first.
+        """
+        with self._lock:
+            return list(self._records)
+
+    def clear(self):
+        """
+        Discards all collected :attr:`records`.
+        """
+        with self._lock:
+            self._records.clear()
+
+    def sample(self):
+        """
+        Decides whether the next call should be profiled.
+        """
+        return self.rate >= 1 or random.random() < self.rate
+
+    def run(self, endpoint, name, version, arguments, func, *args):
+        """
+        Invokes *func* with given *args* and profiles the invocation, which
+        is a call to the operation *name* in given *version* of the
+        *endpoint* with the given *arguments*. Returns the return value of
+        *func*.
+        """
+        profile = self.factory()
+        try:
+            profile.enable()
+        except ValueError:
+            # another profiler is already active in this process
+            return func(*args)
+        start = time.perf_counter_ns()
+        try:
+            return func(*args)
+        finally:
+            profile.disable()
+            duration = time.perf_counter_ns() - start
+            if self.threshold is None or duration >= self.threshold * 1e9:
+                self._store(ProfileRecord(
+                    endpoint, name, version, _hash_arguments(arguments),
+                    duration, time.time(), profile))
+
+    def _store(self, record):
+        with self._lock:
+            self._records.append(record)
+        if not self.outdir:
+            return
+        try:
+            record.profile.dump_stats(
+                os.path.join(self.outdir, record.filename))
+        except Exception:
+            log.exception('Could not write profile %s', record.filename)
+
+
+def _hash_arguments(arguments):
+    data = _canonical_key(arguments)
+    return hashlib.sha1(data.encode('UTF-8')).hexdigest()[:12]
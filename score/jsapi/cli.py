@@ -38,11 +38,20 @@ def main():
 
 
 @main.command('build')
+@click.option('--bundle/--no-bundle', default=None,
+              help='Write a single, self-contained jsapi.js')
+@click.option('--minify/--no-minify', default=None,
+              help='Minify the bundle (requires rjsmin)')
+@click.option('--compress', multiple=True, type=click.Choice(['gzip', 'br']),
+              help='Also write pre-compressed files with given encoding')
 @click.argument('target_folder')
 @click.pass_context
-def build(clickctx, target_folder):
+def build(clickctx, target_folder, bundle, minify, compress):
     """
     Render javascript files into folder
     """
     jsapi = clickctx.obj['conf'].load('jsapi')
-    jsapi.build(target_folder)
+    files = jsapi.build(target_folder, bundle=bundle, minify=minify,
+                        compress=compress or None)
+    for file in files:
+        click.echo(file)
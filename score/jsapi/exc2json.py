@@ -26,21 +26,25 @@
 # the Licensee has his registered seat, an establishment or assets.
 
 
+import collections
+import functools
+import itertools
+import linecache
 import traceback
 
 
-def exc2json(excinfo, untrace=[]):
+def exc2json(excinfo, untrace=(), *, source=True, depth=None):
     """
     Converts exception info (as returned by :func:`sys.exc_info`) into a
     3-tuple that can be converted into a json string by python's :mod:`json`
     library. It will consist of the exception name, the message and the stack
-    trace as provided by :func:`traceback.extract_tb`::
+    trace in the format of :func:`traceback.extract_tb`::
 
         {
             type: 'ZeroDivisionError',
             message: 'division by zero',
             trace: [
-                [<filename>, <lineno>, <line>],
+                [<filename>, <lineno>, <function>, <line>],
                 ...
             ]
         }
@@ -50,17 +54,41 @@ def exc2json(excinfo, untrace=[]):
 
     The optional parameter *untrace* contains file names that will be removed
     from the beginning of the stack trace.
+
+    Reading the source code *line* of each frame can be disabled by passing a
+    false value for *source*, in which case the line will be `None`. The
+    *depth* limits the trace to the given number of innermost frames.
+
+    The frames of recently serialized tracebacks are cached, so repeated
+    errors at the same location are cheap to convert. Since source lines are
+    cached as well, changes to the source files will not be reflected until
+    the process is restarted.
     """
     trace = None
     if len(excinfo) > 2:
-        trace = traceback.extract_tb(excinfo[2])
-        untrace.append(__file__)
-        while trace and any(skip for skip in untrace if skip in trace[0][0]):
-            trace = trace[1:]
-        trace = list(map(
-            lambda frame: (frame[0], frame[1], frame[2], frame[3]), trace))
+        untrace = tuple(untrace) + (__file__,)
+        frames = (
+            (frame.f_code.co_filename, lineno, frame.f_code.co_name)
+            for frame, lineno in traceback.walk_tb(excinfo[2]))
+        frames = itertools.dropwhile(
+            lambda frame: any(skip in frame[0] for skip in untrace), frames)
+        if depth is not None:
+            frames = collections.deque(frames, maxlen=depth)
+        trace = list(_format_frames(tuple(frames), bool(source)))
     return {
         'type': excinfo[0].__name__,
         'message': str(excinfo[1]),
         'trace': trace,
     }
+
+
+@functools.lru_cache(maxsize=256)
+def _format_frames(frames, source):
+    if not source:
+        return tuple((filename, lineno, name, None)
+                     for filename, lineno, name in frames)
+    result = []
+    for filename, lineno, name in frames:
+        line = linecache.getline(filename, lineno).strip() or None
+        result.append((filename, lineno, name, line))
+    return tuple(result)
@@ -0,0 +1,76 @@
+/**
+ * Copyright © 2015-2017 STRG.AT GmbH, Vienna, Austria
+ * Copyright © 2018 Necdet Can Ateşman, Vienna, Austria
+ *
+ * This file is part of the The SCORE Framework.
+ *
+ * The SCORE Framework and all its parts are free software: you can redistribute
+ * them and/or modify them under the terms of the GNU Lesser General Public
+ * License version 3 as published by the Free Software Foundation which is in the
+ * file named COPYING.LESSER.txt.
+ *
+ * The SCORE Framework and all its parts are distributed without any WARRANTY;
+ * without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+ * PARTICULAR PURPOSE. For more details see the GNU Lesser General Public
+ * License.
+ *
+ * If you have not received a copy of the GNU Lesser General Public License see
+ * http://www.gnu.org/licenses/.
+ *
+ * The License-Agreement realised between you as Licensee and STRG.AT GmbH as
+ * Licenser including the issue of its valid conclusion and its pre- and
+ * post-contractual effects is governed by the laws of Austria. Any disputes
+ * concerning this License-Agreement including the issue of its valid conclusion
+ * and its pre- and post-contractual effects are exclusively decided by the
+ * competent court, in whose district STRG.AT GmbH has its registered seat, at
+ * the discretion of STRG.AT GmbH also the competent court, in whose district the
+ * Licensee has his registered seat, an establishment or assets.
+ */
+/* eslint-disable */
+/* tslint:disable */
+
+// Rehydrates the records of results, that the server sent column by column.
+
+const TYPES = {
+    int32: typeof Int32Array === 'function' ? Int32Array : null,
+    float64: typeof Float64Array === 'function' ? Float64Array : null,
+};
+
+function unpack(column, type) {
+    // packed columns arrive as little-endian bytes, which is the byte order
+    // of typed arrays on all relevant platforms
+    if (!type) {
+        return column;
+    }
+    const cls = TYPES[type];
+    if (column.byteOffset % cls.BYTES_PER_ELEMENT) {
+        column = new Uint8Array(column);
+    }
+    return new cls(column.buffer, column.byteOffset,
+        column.byteLength / cls.BYTES_PER_ELEMENT);
+};
+
+export function rehydrate(data) {
+    const keys = data.keys;
+    const columns = {};
+    const values = new Array(keys.length);
+    for (let k = 0; k < keys.length; k++) {
+        values[k] = unpack(data.columns[k], data.types ? data.types[k] : null);
+        columns[keys[k]] = values[k];
+    }
+    if (data.rehydrate === false) {
+        return columns;
+    }
+    const records = new Array(data.length);
+    for (let i = 0; i < data.length; i++) {
+        const record = {};
+        for (let k = 0; k < keys.length; k++) {
+            record[keys[k]] = values[k][i];
+        }
+        records[i] = record;
+    }
+    Object.defineProperty(records, 'columns', {value: columns});
+    return records;
+};
+
+export default rehydrate;
@@ -33,5 +33,6 @@ import Endpoint from './base';
 
 export * from './base';
 export * from './url';
+export * from './url/fetch';
 
 export default Endpoint;
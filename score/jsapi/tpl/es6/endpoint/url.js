@@ -30,32 +30,59 @@
 /* tslint:disable */
 
 import Endpoint from './base';
+import msgpack from '../msgpack';
 
 export class UrlEndpoint extends Endpoint {
 
-    constructor(name, operations, url, method) {
+    constructor(name, operations, url, method, options) {
         super(name, operations);
         this.url = url;
         this.method = method || 'POST';
+        this.options = options || {};
     }
 
-    send(requests) {
+    send(requests, onResult, signal) {
         if (this.method == 'GET') {
-            return this.sendEach(requests);
+            return this.sendEach(requests, signal);
+        } else if (this.options.streaming && typeof fetch === 'function' && typeof TextDecoder === 'function') {
+            return this.sendStream(requests, onResult, signal ? {signal: signal} : undefined);
         } else {
-            return this.sendBulk(requests);
+            return this.sendBulk(requests, signal);
         }
     }
 
-    sendBulk(requests) {
+    sendBulk(requests, signal) {
         return new Promise((resolve, reject) => {
+            if (signal && signal.aborted) {
+                reject(signal.reason || new Error('Request aborted'));
+                return;
+            }
+            const binary = this.options.binary && typeof DataView === 'function';
             const request = new XMLHttpRequest();
-            request.onreadystatechange = function() {
+            const abort = function() {
+                request.abort();
+            };
+            if (signal) {
+                signal.addEventListener('abort', abort);
+            }
+            request.onreadystatechange = () => {
                 if (request.readyState !== 4) {
                     return;
                 }
+                if (signal) {
+                    signal.removeEventListener('abort', abort);
+                    if (signal.aborted) {
+                        reject(signal.reason || new Error('Request aborted'));
+                        return;
+                    }
+                }
                 if (request.status === 200) {
-                    resolve(JSON.parse(request.responseText));
+                    if (binary) {
+                        resolve(this.decode(request.getResponseHeader('Content-Type'), request.response));
+                    } else {
+                        resolve(JSON.parse(request.responseText));
+                    }
+                    return;
                 }
                 const msg = 'Received unexpected status code ' +
                     request.status + ': ' + request.statusText;
@@ -68,7 +95,17 @@ export class UrlEndpoint extends Endpoint {
                     data.push('requests[]=' + encodeURIComponent(JSON.stringify(requests[i])));
                 }
                 request.open('GET', this.url + '?' + data.join('&'));
+                if (binary) {
+                    request.responseType = 'arraybuffer';
+                    request.setRequestHeader("Accept", "application/msgpack");
+                }
                 request.send();
+            } else if (binary) {
+                request.open(this.method, this.url);
+                request.responseType = 'arraybuffer';
+                request.setRequestHeader("Content-Type", "application/msgpack");
+                request.setRequestHeader("Accept", "application/msgpack");
+                request.send(msgpack.encode(requests));
             } else {
                 request.open(this.method, this.url);
                 request.setRequestHeader("Content-Type", "application/json");
@@ -77,9 +114,69 @@ export class UrlEndpoint extends Endpoint {
         });
     };
 
-    sendEach(requests) {
+    sendStream(requests, onResult, init) {
+        // the server sends each response as a separate line of json as soon
+        // as it is available, tagged with the index of its request
+        init = Object.assign({
+            method: this.method,
+            headers: {
+                'Content-Type': 'application/json',
+                'Accept': 'application/x-ndjson, application/json',
+            },
+            body: JSON.stringify(requests),
+            credentials: 'same-origin',
+        }, init);
+        return fetch(this.url, init).then((response) => {
+            if (response.status !== 200) {
+                throw new Error('Received unexpected status code ' +
+                    response.status + ': ' + response.statusText);
+            }
+            const contentType = response.headers.get('Content-Type') || '';
+            if (contentType.indexOf('application/x-ndjson') !== 0 || !response.body) {
+                return response.json();
+            }
+            const responses = new Array(requests.length);
+            const reader = response.body.getReader();
+            const decoder = new TextDecoder();
+            let buffer = '';
+            const receive = (line) => {
+                if (!line) {
+                    return;
+                }
+                const result = JSON.parse(line);
+                responses[result.index] = result;
+                if (onResult) {
+                    onResult(result.index, result);
+                }
+            };
+            const read = () => reader.read().then((chunk) => {
+                if (chunk.done) {
+                    receive(buffer + decoder.decode());
+                    return responses;
+                }
+                buffer += decoder.decode(chunk.value, {stream: true});
+                const lines = buffer.split('\n');
+                buffer = lines.pop();
+                lines.forEach(receive);
+                return read();
+            });
+            return read();
+        });
+    };
+
+    decode(contentType, body) {
+        // binary endpoints receive an ArrayBuffer, which will still contain
+        // json if the server has no msgpack support
+        const bytes = new Uint8Array(body);
+        if ((contentType || '').indexOf('msgpack') >= 0) {
+            return msgpack.decode(bytes);
+        }
+        return JSON.parse(msgpack.decodeText(bytes));
+    };
+
+    sendEach(requests, signal) {
         return Promise.all(requests.map((request) => {
-            return this.sendBulk([request]).then((result) => {
+            return this.sendBulk([request], signal).then((result) => {
                 return result[0];
             });
         }));
@@ -0,0 +1,145 @@
+/**
+ * Copyright © 2015-2017 STRG.AT GmbH, Vienna, Austria
+ * Copyright © 2018 Necdet Can Ateşman, Vienna, Austria
+ *
+ * This file is part of the The SCORE Framework.
+ *
+ * The SCORE Framework and all its parts are free software: you can redistribute
+ * them and/or modify them under the terms of the GNU Lesser General Public
+ * License version 3 as published by the Free Software Foundation which is in the
+ * file named COPYING.LESSER.txt.
+ *
+ * The SCORE Framework and all its parts are distributed without any WARRANTY;
+ * without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+ * PARTICULAR PURPOSE. For more details see the GNU Lesser General Public
+ * License.
+ *
+ * If you have not received a copy of the GNU Lesser General Public License see
+ * http://www.gnu.org/licenses/.
+ *
+ * The License-Agreement realised between you as Licensee and STRG.AT GmbH as
+ * Licenser including the issue of its valid conclusion and its pre- and
+ * post-contractual effects is governed by the laws of Austria. Any disputes
+ * concerning this License-Agreement including the issue of its valid conclusion
+ * and its pre- and post-contractual effects are exclusively decided by the
+ * competent court, in whose district STRG.AT GmbH has its registered seat, at
+ * the discretion of STRG.AT GmbH also the competent court, in whose district the
+ * Licensee has his registered seat, an establishment or assets.
+ */
+/* eslint-disable */
+/* tslint:disable */
+
+import { UrlEndpoint } from '../url';
+import msgpack from '../../msgpack';
+
+// browsers refuse keepalive requests exceeding a total of 64KiB
+const KEEPALIVE_LIMIT = 60000;
+
+export class FetchEndpoint extends UrlEndpoint {
+
+    send(requests, onResult, signal) {
+        if (this.method == 'GET') {
+            return this.sendEach(requests, signal);
+        } else if (this.options.streaming && typeof TextDecoder === 'function') {
+            return this.abortable(signal, (signal) => {
+                const body = this.encode(requests);
+                return this.sendStream(requests, onResult, {
+                    body: body,
+                    keepalive: body.length < KEEPALIVE_LIMIT,
+                    signal: signal,
+                });
+            });
+        } else {
+            return this.sendBulk(requests, signal);
+        }
+    }
+
+    sendBulk(requests, signal) {
+        return this.abortable(signal, (signal) => {
+            let url = this.url;
+            const init = {
+                method: this.method,
+                credentials: 'same-origin',
+                signal: signal,
+            };
+            if (this.method === 'GET') {
+                const data = [];
+                for (let i = 0; i < requests.length; i++) {
+                    data.push('requests[]=' + encodeURIComponent(JSON.stringify(requests[i])));
+                }
+                url += '?' + data.join('&');
+                if (this.options.binary) {
+                    init.headers = {'Accept': 'application/msgpack'};
+                }
+            } else if (this.options.binary) {
+                init.headers = {
+                    'Content-Type': 'application/msgpack',
+                    'Accept': 'application/msgpack',
+                };
+                init.body = msgpack.encode(requests);
+                init.keepalive = init.body.length < KEEPALIVE_LIMIT;
+            } else {
+                init.headers = {'Content-Type': 'application/json'};
+                init.body = this.encode(requests);
+                // allow the request to outlive the page, if it is small enough
+                init.keepalive = init.body.length < KEEPALIVE_LIMIT;
+            }
+            return fetch(url, init).then((response) => {
+                if (response.status !== 200) {
+                    throw new Error('Received unexpected status code ' +
+                        response.status + ': ' + response.statusText);
+                }
+                if (this.options.binary) {
+                    return response.arrayBuffer().then((body) => {
+                        return this.decode(response.headers.get('Content-Type'), body);
+                    });
+                }
+                return response.json();
+            });
+        });
+    };
+
+    encode(requests) {
+        // the keepalive limit applies to the number of bytes
+        const body = JSON.stringify(requests);
+        if (typeof TextEncoder === 'function') {
+            return new TextEncoder().encode(body);
+        }
+        return body;
+    };
+
+    abortable(signal, send) {
+        // invokes *send* with a signal, that aborts the request when the
+        // given *signal* fires or when the configured timeout elapses
+        const timeout = this.options.timeout;
+        if (!timeout || typeof AbortController !== 'function') {
+            return send(signal);
+        }
+        const controller = new AbortController();
+        const abort = () => {
+            controller.abort(signal.reason);
+        };
+        if (signal) {
+            if (signal.aborted) {
+                abort();
+            } else {
+                signal.addEventListener('abort', abort);
+            }
+        }
+        const timer = setTimeout(() => {
+            controller.abort(new Error('Request timed out after ' + timeout + 'ms'));
+        }, timeout);
+        const done = () => {
+            clearTimeout(timer);
+            if (signal) {
+                signal.removeEventListener('abort', abort);
+            }
+        };
+        const promise = send(controller.signal);
+        promise.then(done, done);
+        return promise;
+    };
+
+}
+
+export default FetchEndpoint;
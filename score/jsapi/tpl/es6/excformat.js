@@ -30,7 +30,7 @@
 /* tslint:disable */
 
 export function excformat(exc) {
-    if (typeof exc.trace === 'undefined') {
+    if (typeof exc.trace === 'undefined' || exc.trace === null) {
         return exc.type + ': ' + exc.message
     }
     let msg = 'Traceback (most recent call last):\n';
@@ -39,7 +39,9 @@ export function excformat(exc) {
         msg += '  File "' + frame[0] +
             '", line "' + frame[1] +
             '", in ' + frame[2] + '\n';
-        msg += '    ' + frame[3] + '\n';
+        if (frame[3] !== null && typeof frame[3] !== 'undefined') {
+            msg += '    ' + frame[3] + '\n';
+        }
     }
     msg += '\n' + exc.type + ': ' + exc.message;
     return msg;
@@ -0,0 +1,327 @@
+/**
+ * Copyright © 2015-2017 STRG.AT GmbH, Vienna, Austria
+ * Copyright © 2018 Necdet Can Ateşman, Vienna, Austria
+ *
+ * This file is part of the The SCORE Framework.
+ *
+ * The SCORE Framework and all its parts are free software: you can redistribute
+ * them and/or modify them under the terms of the GNU Lesser General Public
+ * License version 3 as published by the Free Software Foundation which is in the
+ * file named COPYING.LESSER.txt.
+ *
+ * The SCORE Framework and all its parts are distributed without any WARRANTY;
+ * without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+ * PARTICULAR PURPOSE. For more details see the GNU Lesser General Public
+ * License.
+ *
+ * If you have not received a copy of the GNU Lesser General Public License see
+ * http://www.gnu.org/licenses/.
+ *
+ * The License-Agreement realised between you as Licensee and STRG.AT GmbH as
+ * Licenser including the issue of its valid conclusion and its pre- and
+ * post-contractual effects is governed by the laws of Austria. Any disputes
+ * concerning this License-Agreement including the issue of its valid conclusion
+ * and its pre- and post-contractual effects are exclusively decided by the
+ * competent court, in whose district STRG.AT GmbH has its registered seat, at
+ * the discretion of STRG.AT GmbH also the competent court, in whose district the
+ * Licensee has his registered seat, an establishment or assets.
+ */
+/* eslint-disable */
+/* tslint:disable */
+
+// A compact MessagePack (https://msgpack.org/) encoder and decoder for the
+// wire format of binary endpoints.
+
+const textEncoder = typeof TextEncoder === 'function' ? new TextEncoder() : null;
+const textDecoder = typeof TextDecoder === 'function' ? new TextDecoder() : null;
+
+function encodeText(string) {
+    if (textEncoder) {
+        return textEncoder.encode(string);
+    }
+    const bytes = [];
+    for (let i = 0; i < string.length; i++) {
+        let code = string.charCodeAt(i);
+        if (code >= 0xd800 && code < 0xdc00 && i + 1 < string.length) {
+            const next = string.charCodeAt(i + 1);
+            if (next >= 0xdc00 && next < 0xe000) {
+                code = 0x10000 + ((code - 0xd800) << 10) + (next - 0xdc00);
+                i++;
+            }
+        }
+        if (code < 0x80) {
+            bytes.push(code);
+        } else if (code < 0x800) {
+            bytes.push(0xc0 | (code >> 6), 0x80 | (code & 0x3f));
+        } else if (code < 0x10000) {
+            bytes.push(0xe0 | (code >> 12), 0x80 | ((code >> 6) & 0x3f), 0x80 | (code & 0x3f));
+        } else {
+            bytes.push(0xf0 | (code >> 18), 0x80 | ((code >> 12) & 0x3f), 0x80 | ((code >> 6) & 0x3f), 0x80 | (code & 0x3f));
+        }
+    }
+    return new Uint8Array(bytes);
+};
+
+export function decodeText(bytes, start, end) {
+    start = start || 0;
+    end = typeof end === 'undefined' ? bytes.length : end;
+    if (textDecoder) {
+        return textDecoder.decode(bytes.subarray(start, end));
+    }
+    let string = '';
+    let i = start;
+    while (i < end) {
+        let code = bytes[i++];
+        if (code >= 0xf0) {
+            code = ((code & 0x07) << 18) | ((bytes[i++] & 0x3f) << 12) | ((bytes[i++] & 0x3f) << 6) | (bytes[i++] & 0x3f);
+        } else if (code >= 0xe0) {
+            code = ((code & 0x0f) << 12) | ((bytes[i++] & 0x3f) << 6) | (bytes[i++] & 0x3f);
+        } else if (code >= 0xc0) {
+            code = ((code & 0x1f) << 6) | (bytes[i++] & 0x3f);
+        }
+        if (code >= 0x10000) {
+            code -= 0x10000;
+            string += String.fromCharCode(0xd800 + (code >> 10), 0xdc00 + (code & 0x3ff));
+        } else {
+            string += String.fromCharCode(code);
+        }
+    }
+    return string;
+};
+
+export function encode(value) {
+    let buffer = new Uint8Array(256);
+    let view = new DataView(buffer.buffer);
+    let length = 0;
+    const reserve = (size) => {
+        if (length + size <= buffer.length) {
+            return;
+        }
+        let capacity = buffer.length * 2;
+        while (capacity < length + size) {
+            capacity *= 2;
+        }
+        const grown = new Uint8Array(capacity);
+        grown.set(buffer);
+        buffer = grown;
+        view = new DataView(buffer.buffer);
+    };
+    // writes a type byte followed by an unsigned size of 0, 1, 2 or 4 bytes
+    const head = (type, bytes, size) => {
+        reserve(1 + bytes);
+        buffer[length++] = type;
+        if (bytes === 1) {
+            view.setUint8(length, size);
+        } else if (bytes === 2) {
+            view.setUint16(length, size);
+        } else if (bytes === 4) {
+            view.setUint32(length, size);
+        }
+        length += bytes;
+    };
+    const sized = (fix, fixLimit, type, size) => {
+        if (size < fixLimit) {
+            head(fix | size, 0);
+        } else if (type === 0xd9 && size < 0x100) {
+            head(type, 1, size);
+        } else if (size < 0x10000) {
+            head(type === 0xd9 ? 0xda : type, 2, size);
+        } else {
+            head(type === 0xd9 ? 0xdb : type + 1, 4, size);
+        }
+    };
+    const raw = (data) => {
+        reserve(data.length);
+        buffer.set(data, length);
+        length += data.length;
+    };
+    const write = (value) => {
+        if (value === null || typeof value === 'undefined') {
+            head(0xc0, 0);
+        } else if (value === false) {
+            head(0xc2, 0);
+        } else if (value === true) {
+            head(0xc3, 0);
+        } else if (typeof value === 'number') {
+            if (!Number.isSafeInteger(value)) {
+                reserve(9);
+                buffer[length++] = 0xcb;
+                view.setFloat64(length, value);
+                length += 8;
+            } else if (value < -0x80000000 || value > 0xffffffff) {
+                // integers beyond 32 bits are sent as (u)int64, so they arrive
+                // as integers in python, just like they would with json
+                reserve(9);
+                buffer[length++] = value > 0 ? 0xcf : 0xd3;
+                view.setInt32(length, Math.floor(value / 0x100000000));
+                view.setUint32(length + 4, value >>> 0);
+                length += 8;
+            } else if (value >= 0) {
+                if (value < 0x80) {
+                    head(value, 0);
+                } else if (value < 0x100) {
+                    head(0xcc, 1, value);
+                } else if (value < 0x10000) {
+                    head(0xcd, 2, value);
+                } else {
+                    head(0xce, 4, value);
+                }
+            } else if (value >= -0x20) {
+                head(value & 0xff, 0);
+            } else if (value >= -0x80) {
+                head(0xd0, 1, value & 0xff);
+            } else if (value >= -0x8000) {
+                head(0xd1, 2, value & 0xffff);
+            } else {
+                head(0xd2, 4, value >>> 0);
+            }
+        } else if (typeof value === 'string') {
+            const data = encodeText(value);
+            sized(0xa0, 0x20, 0xd9, data.length);
+            raw(data);
+        } else if (value instanceof Uint8Array || value instanceof ArrayBuffer) {
+            const data = new Uint8Array(value);
+            if (data.length < 0x100) {
+                head(0xc4, 1, data.length);
+            } else if (data.length < 0x10000) {
+                head(0xc5, 2, data.length);
+            } else {
+                head(0xc6, 4, data.length);
+            }
+            raw(data);
+        } else if (Array.isArray(value)) {
+            sized(0x90, 0x10, 0xdc, value.length);
+            for (let i = 0; i < value.length; i++) {
+                write(value[i]);
+            }
+        } else if (typeof value.toJSON === 'function') {
+            write(value.toJSON());
+        } else if (typeof value === 'object') {
+            // omit undefined members, just like JSON.stringify()
+            const keys = Object.keys(value).filter((key) => {
+                return typeof value[key] !== 'undefined' && typeof value[key] !== 'function';
+            });
+            sized(0x80, 0x10, 0xde, keys.length);
+            for (let i = 0; i < keys.length; i++) {
+                write(keys[i]);
+                write(value[keys[i]]);
+            }
+        } else {
+            head(0xc0, 0);
+        }
+    };
+    write(value);
+    return buffer.subarray(0, length);
+};
+
+export function decode(data) {
+    const bytes = data instanceof Uint8Array ? data : new Uint8Array(data);
+    const view = new DataView(bytes.buffer, bytes.byteOffset, bytes.byteLength);
+    let offset = 0;
+    const uint = (size) => {
+        let value;
+        if (size === 1) {
+            value = view.getUint8(offset);
+        } else if (size === 2) {
+            value = view.getUint16(offset);
+        } else if (size === 4) {
+            value = view.getUint32(offset);
+        } else {
+            value = view.getUint32(offset) * 0x100000000 + view.getUint32(offset + 4);
+        }
+        offset += size;
+        return value;
+    };
+    const sint = (size) => {
+        let value;
+        if (size === 1) {
+            value = view.getInt8(offset);
+        } else if (size === 2) {
+            value = view.getInt16(offset);
+        } else if (size === 4) {
+            value = view.getInt32(offset);
+        } else {
+            value = view.getInt32(offset) * 0x100000000 + view.getUint32(offset + 4);
+        }
+        offset += size;
+        return value;
+    };
+    const str = (size) => {
+        const value = decodeText(bytes, offset, offset + size);
+        offset += size;
+        return value;
+    };
+    const bin = (size) => {
+        const value = bytes.slice(offset, offset + size);
+        offset += size;
+        return value;
+    };
+    const array = (size) => {
+        const value = new Array(size);
+        for (let i = 0; i < size; i++) {
+            value[i] = read();
+        }
+        return value;
+    };
+    const map = (size) => {
+        const value = {};
+        for (let i = 0; i < size; i++) {
+            const key = read();
+            if (key === '__proto__') {
+                Object.defineProperty(value, key, {value: read(), enumerable: true, writable: true, configurable: true});
+            } else {
+                value[key] = read();
+            }
+        }
+        return value;
+    };
+    const read = () => {
+        const type = bytes[offset++];
+        if (type < 0x80) {
+            return type;
+        } else if (type < 0x90) {
+            return map(type & 0x0f);
+        } else if (type < 0xa0) {
+            return array(type & 0x0f);
+        } else if (type < 0xc0) {
+            return str(type & 0x1f);
+        } else if (type >= 0xe0) {
+            return type - 0x100;
+        }
+        switch (type) {
+            case 0xc0: return null;
+            case 0xc2: return false;
+            case 0xc3: return true;
+            case 0xc4: return bin(uint(1));
+            case 0xc5: return bin(uint(2));
+            case 0xc6: return bin(uint(4));
+            case 0xca: offset += 4; return view.getFloat32(offset - 4);
+            case 0xcb: offset += 8; return view.getFloat64(offset - 8);
+            case 0xcc: return uint(1);
+            case 0xcd: return uint(2);
+            case 0xce: return uint(4);
+            case 0xcf: return uint(8);
+            case 0xd0: return sint(1);
+            case 0xd1: return sint(2);
+            case 0xd2: return sint(4);
+            case 0xd3: return sint(8);
+            case 0xd9: return str(uint(1));
+            case 0xda: return str(uint(2));
+            case 0xdb: return str(uint(4));
+            case 0xdc: return array(uint(2));
+            case 0xdd: return array(uint(4));
+            case 0xde: return map(uint(2));
+            case 0xdf: return map(uint(4));
+        }
+        throw new Error('Unsupported MessagePack type 0x' + type.toString(16));
+    };
+    return read();
+};
+
+export const msgpack = {
+    encode: encode,
+    decode: decode,
+    decodeText: decodeText,
+};
+
+export default msgpack;
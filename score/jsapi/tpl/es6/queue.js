@@ -29,6 +29,7 @@
 /* eslint-disable */
 /* tslint:disable */
 
+import rehydrate from './columns';
 import Endpoint from './endpoint';
 import excformat from './excformat';
 import Exception from './exception';
@@ -46,22 +47,168 @@ function defer() {
     };
 };
 
+function abortReason(signal) {
+    if (typeof signal.reason !== 'undefined') {
+        return signal.reason;
+    }
+    return new Error('Call aborted');
+};
+
+function complete(request) {
+    if (request.settled) {
+        return false;
+    }
+    request.settled = true;
+    if (request.signal) {
+        request.signal.removeEventListener('abort', request.onabort);
+    }
+    if (request.timer !== null) {
+        clearTimeout(request.timer);
+    }
+    return true;
+};
+
+function fail(request, error) {
+    if (complete(request)) {
+        request.reject(error);
+    }
+};
+
+function settle(request, response) {
+    if (!complete(request)) {
+        return;
+    }
+    if (!response) {
+        request.reject(new Exception('No response received'));
+        return;
+    }
+    let result = response.result;
+    if (response.success) {
+        if (response.format === 'columns') {
+            result = rehydrate(result);
+        }
+        request.resolve(result);
+        return;
+    }
+    if (result && result.trace) {
+        let desc = request.data[0];
+        if (request.data[1]) {
+            desc += '/' + request.data[1];
+        }
+        const args = ['Error in jsapi call', desc, '('];
+        for (let j = 2; j < request.data.length; j++) {
+            if (j != 2) {
+                args.push(',');
+            }
+            args.push(request.data[j]);
+        }
+        args.push(')');
+        args.push("\n" + excformat(result));
+        console.error.apply(console, args);  // eslint-disable-line no-console
+    }
+    if (result) {
+        const data = result;
+        if (data.type in Exception.classes) {
+            result = new Exception.classes[data.type](data.message);
+        } else {
+            result = new Exception(data.message);
+        }
+        if (typeof data.retry_after === 'number') {
+            result.retryAfter = data.retry_after;
+        }
+    } else {
+        result = new Exception();
+    }
+    request.reject(result);
+};
+
 export class Queue {
 
-    constructor() {
+    constructor(options) {
+        this.options = {
+            // "timeout", "microtask", "idle" or a function receiving a
+            // callback, that must be invoked to send the queued requests
+            scheduler: 'timeout',
+            // milliseconds to wait for further calls ("timeout"), or the
+            // maximum time to wait for an idle period ("idle")
+            delay: 0,
+            // maximum number of calls per request, 0 means unlimited
+            maxBatchSize: 0,
+            // approximate maximum size of a request body, 0 means unlimited
+            maxBatchBytes: 0,
+        };
+        this.configure(options);
         this.queuedRequests = [];
+        // maps keys of coalescing requests to queued and in-flight requests
+        this.coalescingRequests = {};
         this.flushDeferred = null;
         this._flush = this._flush.bind(this);
     }
 
-    queue(data, endpoint) {
+    configure(options) {
+        for (const key in options || {}) {
+            this.options[key] = options[key];
+        }
+    }
+
+    queue(data, endpoint, coalesce, signal, timeout) {
+        if (signal && signal.aborted) {
+            return Promise.reject(abortReason(signal));
+        }
+        let key = null;
+        if (coalesce && !signal && !timeout) {
+            // identical calls to idempotent operations share a single
+            // request, regardless of whether it was already sent. calls
+            // with an abort signal or a timeout are never shared, since
+            // aborting one of them must not affect the others.
+            key = endpoint.name + ':' + JSON.stringify(data);
+            if (key in this.coalescingRequests) {
+                return this.coalescingRequests[key].promise;
+            }
+        }
         const request = defer();
         request.data = data;
         request.endpoint = endpoint;
+        request.key = key;
+        request.batch = null;
+        request.signal = signal || null;
+        if (signal) {
+            request.onabort = () => {
+                this.cancel(request, abortReason(signal));
+            };
+            signal.addEventListener('abort', request.onabort);
+        }
+        request.timer = null;
+        if (timeout) {
+            request.timer = setTimeout(() => {
+                this.cancel(request, new Error('Call timed out after ' + timeout + 'ms'));
+            }, timeout);
+        }
         this.queuedRequests.push(request);
+        if (key !== null) {
+            this.coalescingRequests[key] = request;
+        }
         return request.promise;
     };
 
+    cancel(request, reason) {
+        // rejects a single request: queued requests are simply removed,
+        // in-flight batches are aborted once all of their calls are
+        // cancelled
+        if (request.settled) {
+            return;
+        }
+        const index = this.queuedRequests.indexOf(request);
+        if (index >= 0) {
+            this.queuedRequests.splice(index, 1);
+        }
+        fail(request, reason);
+        const batch = request.batch;
+        if (batch && batch.controller && batch.requests.every((r) => r.settled)) {
+            batch.controller.abort(reason);
+        }
+    };
+
     flush() {
         // return existing flush promise, if there is one
         if (this.flushDeferred) {
@@ -74,10 +221,51 @@ export class Queue {
         this.flushDeferred = defer();
         // wait until current code block is finished before sending the
         // request to the server, we might receive some more requests.
-        window.setTimeout(this._flush);
+        this.schedule(this._flush);
         return this.flushDeferred.promise;
     };
 
+    schedule(callback) {
+        const scheduler = this.options.scheduler;
+        if (typeof scheduler === 'function') {
+            scheduler(callback);
+        } else if (scheduler === 'microtask') {
+            if (typeof queueMicrotask === 'function') {
+                queueMicrotask(callback);
+            } else {
+                Promise.resolve().then(callback);
+            }
+        } else if (scheduler === 'idle' && typeof requestIdleCallback === 'function') {
+            requestIdleCallback(callback, this.options.delay ? {timeout: this.options.delay} : undefined);
+        } else {
+            setTimeout(callback, this.options.delay);
+        }
+    };
+
+    split(requests) {
+        // split requests into chunks adhering to the configured batch limits
+        const maxSize = this.options.maxBatchSize;
+        const maxBytes = this.options.maxBatchBytes;
+        if (!maxSize && !maxBytes) {
+            return [requests];
+        }
+        const chunks = [];
+        let chunk = [];
+        let bytes = 0;
+        for (let i = 0; i < requests.length; i++) {
+            const size = maxBytes ? JSON.stringify(requests[i].data).length + 1 : 0;
+            if (chunk.length && ((maxSize && chunk.length >= maxSize) || (maxBytes && bytes + size > maxBytes))) {
+                chunks.push(chunk);
+                chunk = [];
+                bytes = 0;
+            }
+            chunk.push(requests[i]);
+            bytes += size;
+        }
+        chunks.push(chunk);
+        return chunks;
+    };
+
     _flush() {
         // map transport name to its requests
         const requests = {};
@@ -88,57 +276,49 @@ export class Queue {
             }
             requests[r.endpoint.name].push(r);
         }
+        // forget coalescing requests once they are complete
+        const release = (requests) => {
+            for (let i = 0; i < requests.length; i++) {
+                const key = requests[i].key;
+                if (key !== null && this.coalescingRequests[key] === requests[i]) {
+                    delete this.coalescingRequests[key];
+                }
+            }
+        };
         // send each endpoint's requests
         const send = function(endpoint, requests) {
             const payload = [];
+            const batch = {requests: requests, controller: null};
             for (let i = 0; i < requests.length; i++) {
                 payload.push(requests[i].data);
+                requests[i].batch = batch;
+                if ((requests[i].signal || requests[i].timer !== null) && typeof AbortController === 'function') {
+                    batch.controller = batch.controller || new AbortController();
+                }
             }
-            return endpoint.send(payload).then(function(responses) {
-                for (let i = 0; i < responses.length; i++) {
-                    const response = responses[i],
-                        success = response.success;
-                    let result = response.result;
-                    if (success) {
-                        requests[i].resolve(result);
-                    } else {
-                        if (result && result.trace) {
-                            const desc = requests[i].data[0];
-                            if (requests[i].data[1]) {
-                                desc += '/' + requests[i].data[1];
-                            }
-                            const args = ['Error in jsapi call', desc, '('];
-                            for (let j = 2; j < requests[i].data.length; j++) {
-                                if (j != 2) {
-                                    args.push(',');
-                                }
-                                args.push(requests[i].data[j]);
-                            }
-                            args.push(')');
-                            args.push("\n" + excformat(result));
-                            console.error.apply(console, args);  // eslint-disable-line no-console
-                        }
-                        if (result) {
-                            if (result.type in Exception.classes) {
-                                result = new Exception.classes[result.type](result.message);
-                            } else {
-                                result = new Exception(result.message);
-                            }
-                        } else {
-                            result = new Exception();
-                        }
-                        requests[i].reject(result);
-                    }
+            // streaming endpoints report each response as soon as it arrives
+            const onResult = function(i, response) {
+                settle(requests[i], response);
+            };
+            const signal = batch.controller ? batch.controller.signal : undefined;
+            return endpoint.send(payload, onResult, signal).then(function(responses) {
+                for (let i = 0; i < requests.length; i++) {
+                    settle(requests[i], responses[i]);
                 }
+                release(requests);
             }).catch(function(error) {
+                release(requests);
                 for (let i = 0; i < requests.length; i++) {
-                    requests[i].reject(error);
+                    fail(requests[i], error);
                 }
             });
         };
         const promises = [];
         for (const endpointName in requests) {
-            promises.push(send(Endpoint.get(endpointName), requests[endpointName]));
+            const chunks = this.split(requests[endpointName]);
+            for (let i = 0; i < chunks.length; i++) {
+                promises.push(send(Endpoint.get(endpointName), chunks[i]));
+            }
         }
         const promise = Promise.all(promises);
         // store instance variables and reset object state
@@ -37,6 +37,13 @@ export class Jsapi {
         this._ops = {};
         this._exceptions = {};
         this._queue = new Queue();
+        // results of operations with a ttl, in least recently used order
+        this._cache = new Map();
+        this._cacheSize = 500;
+        // abort signal of views created via withSignal()
+        this._signal = null;
+        // call timeout in milliseconds of views created via withTimeout()
+        this._timeout = 0;
         endpoints.forEach(endpoint => {
             for (let i = 0; i < endpoint.operations.length; i++) {
                 const operation = endpoint.operations[i]
@@ -52,6 +59,11 @@ export class Jsapi {
                     minargs: operation.minargs,
                     maxargs: operation.maxargs,
                     argnames: operation.argnames,
+                    coalesce: !!operation.coalesce,
+                    ttl: operation.ttl || 0,
+                    // incremented by invalidate(), so that results of calls,
+                    // that were sent before, are not cached
+                    generation: 0,
                     endpoint: endpoint,
                 };
             }
@@ -89,7 +101,83 @@ export class Jsapi {
             }
             request.push(args[i]);
         }
-        return this._queue.queue(request, op.endpoint);
+        if (!op.ttl) {
+            return this._queue.queue(request, op.endpoint, op.coalesce, this._signal, this._timeout);
+        }
+        const key = JSON.stringify(request);
+        const entry = this._cache.get(key);
+        if (entry) {
+            this._cache.delete(key);
+            if (entry.expires > Date.now()) {
+                this._cache.set(key, entry);
+                return Promise.resolve(entry.value);
+            }
+        }
+        const generation = op.generation;
+        const promise = this._queue.queue(request, op.endpoint, op.coalesce, this._signal, this._timeout);
+        promise.then(value => {
+            if (op.generation !== generation) {
+                return;
+            }
+            this._cache.delete(key);
+            this._cache.set(key, {
+                name: func,
+                value: value,
+                expires: Date.now() + op.ttl * 1000,
+            });
+            while (this._cache.size > this._cacheSize) {
+                this._cache.delete(this._cache.keys().next().value);
+            }
+        }, () => {});
+        return promise;
+    }
+
+    configure(options) {
+        options = options || {};
+        const queueOptions = {};
+        for (const key in options) {
+            if (key === 'cacheSize') {
+                this._cacheSize = options[key];
+            } else {
+                queueOptions[key] = options[key];
+            }
+        }
+        this._queue.configure(queueOptions);
+    }
+
+    withSignal(signal) {
+        // returns a view of this api, whose calls are rejected and removed
+        // from the queue (or aborted, if already sent) once the given
+        // AbortSignal fires
+        const api = Object.create(this);
+        api._signal = signal;
+        return api;
+    }
+
+    withTimeout(timeout) {
+        // returns a view of this api, whose calls are rejected and removed
+        // from the queue (or aborted, if already sent) unless they complete
+        // within given number of milliseconds
+        const api = Object.create(this);
+        api._timeout = timeout;
+        return api;
+    }
+
+    invalidate(func) {
+        for (const name in this._ops) {
+            if (typeof func === 'undefined' || name === func) {
+                this._ops[name].generation++;
+            }
+        }
+        if (typeof func === 'undefined') {
+            this._cache.clear();
+            return;
+        }
+        this._cache.forEach((entry, key) => {
+            if (entry.name === func) {
+                this._cache.delete(key);
+            }
+        });
     }
 
     _flush() {
@@ -0,0 +1,98 @@
+/**
+ * Copyright © 2015-2017 STRG.AT GmbH, Vienna, Austria
+ *
+ * This file is part of the The SCORE Framework.
+ *
+ * The SCORE Framework and all its parts are free software: you can redistribute
+ * them and/or modify them under the terms of the GNU Lesser General Public
+ * License version 3 as published by the Free Software Foundation which is in the
+ * file named COPYING.LESSER.txt.
+ *
+ * The SCORE Framework and all its parts are distributed without any WARRANTY;
+ * without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+ * PARTICULAR PURPOSE. For more details see the GNU Lesser General Public
+ * License.
+ *
+ * If you have not received a copy of the GNU Lesser General Public License see
+ * http://www.gnu.org/licenses/.
+ *
+ * The License-Agreement realised between you as Licensee and STRG.AT GmbH as
+ * Licenser including the issue of its valid conclusion and its pre- and
+ * post-contractual effects is governed by the laws of Austria. Any disputes
+ * concerning this License-Agreement including the issue of its valid conclusion
+ * and its pre- and post-contractual effects are exclusively decided by the
+ * competent court, in whose district STRG.AT GmbH has its registered seat, at
+ * the discretion of STRG.AT GmbH also the competent court, in whose district the
+ * Licensee has his registered seat, an establishment or assets.
+ */
+/* eslint-disable */
+/* tslint:disable */
+
+// Universal Module Loader
+// https://github.com/umdjs/umd
+// https://github.com/umdjs/umd/blob/v1.0.0/returnExports.js
+(function (root, factory) {
+    if (typeof define === 'function' && define.amd) {
+        // AMD. Register as an anonymous module.
+        define(factory);
+    } else if (typeof module === 'object' && module.exports) {
+        // Node. Does not work with strict CommonJS, but
+        // only CommonJS-like environments that support module.exports,
+        // like Node.
+        module.exports = factory();
+    } else {
+        // Browser globals (root is window)
+        root.score = root.score || {};
+        root.score.jsapi = root.score.jsapi || {};
+        root.score.jsapi.rehydrate = factory();
+    }
+})(this, function() {
+
+    // Rehydrates the records of results, that the server sent column by
+    // column.
+
+    var TYPES = {
+        int32: typeof Int32Array === 'function' ? Int32Array : null,
+        float64: typeof Float64Array === 'function' ? Float64Array : null,
+    };
+
+    var unpack = function(column, type) {
+        // packed columns arrive as little-endian bytes, which is the byte
+        // order of typed arrays on all relevant platforms
+        if (!type) {
+            return column;
+        }
+        var cls = TYPES[type];
+        if (column.byteOffset % cls.BYTES_PER_ELEMENT) {
+            column = new Uint8Array(column);
+        }
+        return new cls(column.buffer, column.byteOffset,
+            column.byteLength / cls.BYTES_PER_ELEMENT);
+    };
+
+    var rehydrate = function(data) {
+        var keys = data.keys;
+        var columns = {};
+        var values = new Array(keys.length);
+        for (var k = 0; k < keys.length; k++) {
+            values[k] = unpack(data.columns[k], data.types ? data.types[k] : null);
+            columns[keys[k]] = values[k];
+        }
+        if (data.rehydrate === false) {
+            return columns;
+        }
+        var records = new Array(data.length);
+        for (var i = 0; i < data.length; i++) {
+            var record = {};
+            for (var j = 0; j < keys.length; j++) {
+                record[keys[j]] = values[j][i];
+            }
+            records[i] = record;
+        }
+        Object.defineProperty(records, 'columns', {value: columns});
+        return records;
+    };
+
+    return rehydrate;
+
+});
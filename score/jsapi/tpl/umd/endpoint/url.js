@@ -34,41 +34,70 @@
 (function (root, factory) {
     if (typeof define === 'function' && define.amd) {
         // AMD. Register as an anonymous module.
-        define(['../endpoint'], factory);
+        define(['../endpoint', '../msgpack'], factory);
     } else if (typeof module === 'object' && module.exports) {
         // Node. Does not work with strict CommonJS, but
         // only CommonJS-like environments that support module.exports,
         // like Node.
-        module.exports = factory(require('../endpoint'));
+        module.exports = factory(require('../endpoint'), require('../msgpack'));
     } else {
         // Browser globals (root is window)
-        root.score.jsapi.UrlEndpoint = factory(root.score.jsapi.Endpoint);
+        root.score.jsapi.UrlEndpoint = factory(root.score.jsapi.Endpoint, root.score.jsapi.msgpack);
     }
-})(this, function(Endpoint) {
+})(this, function(Endpoint, msgpack) {
 
-    var UrlEndpoint = function(name, operations, url, method) {
+    var UrlEndpoint = function(name, operations, url, method, options) {
         this.url = url;
         this.method = method || 'POST';
-        if (this.method == 'GET') {
-            this.send = this.sendEach;
-        } else {
-            this.send = this.sendBulk;
-        }
+        this.options = options || {};
         Endpoint.call(this, name, operations);
     };
 
     UrlEndpoint.prototype = Object.create(Endpoint.prototype);
 
-    UrlEndpoint.prototype.sendBulk = function(requests) {
+    UrlEndpoint.prototype.send = function(requests, onResult, signal) {
+        if (this.method == 'GET') {
+            return this.sendEach(requests, signal);
+        } else if (this.options.streaming && typeof fetch === 'function' && typeof TextDecoder === 'function') {
+            return this.sendStream(requests, onResult, signal ? {signal: signal} : undefined);
+        } else {
+            return this.sendBulk(requests, signal);
+        }
+    };
+
+    UrlEndpoint.prototype.sendBulk = function(requests, signal) {
         var self = this;
         return new Promise(function(resolve, reject) {
+            if (signal && signal.aborted) {
+                reject(signal.reason || new Error('Request aborted'));
+                return;
+            }
+            var binary = self.options.binary && typeof DataView === 'function';
             var request = new XMLHttpRequest();
+            var abort = function() {
+                request.abort();
+            };
+            if (signal) {
+                signal.addEventListener('abort', abort);
+            }
             request.onreadystatechange = function() {
                 if (request.readyState !== 4) {
                     return;
                 }
+                if (signal) {
+                    signal.removeEventListener('abort', abort);
+                    if (signal.aborted) {
+                        reject(signal.reason || new Error('Request aborted'));
+                        return;
+                    }
+                }
                 if (request.status === 200) {
-                    resolve(JSON.parse(request.responseText));
+                    if (binary) {
+                        resolve(self.decode(request.getResponseHeader('Content-Type'), request.response));
+                    } else {
+                        resolve(JSON.parse(request.responseText));
+                    }
+                    return;
                 }
                 var msg = 'Received unexpected status code ' +
                     request.status + ': ' + request.statusText;
@@ -81,7 +110,17 @@
                     data.push('requests[]=' + encodeURIComponent(JSON.stringify(requests[i])));
                 }
                 request.open('GET', self.url + '?' + data.join('&'));
+                if (binary) {
+                    request.responseType = 'arraybuffer';
+                    request.setRequestHeader("Accept", "application/msgpack");
+                }
                 request.send();
+            } else if (binary) {
+                request.open(self.method, self.url);
+                request.responseType = 'arraybuffer';
+                request.setRequestHeader("Content-Type", "application/msgpack");
+                request.setRequestHeader("Accept", "application/msgpack");
+                request.send(msgpack.encode(requests));
             } else {
                 request.open(self.method, self.url);
                 request.setRequestHeader("Content-Type", "application/json");
@@ -90,10 +129,75 @@
         });
     };
 
-    UrlEndpoint.prototype.sendEach = function(requests) {
+    UrlEndpoint.prototype.sendStream = function(requests, onResult, init) {
+        // the server sends each response as a separate line of json as soon
+        // as it is available, tagged with the index of its request
+        var options = {
+            method: this.method,
+            headers: {
+                'Content-Type': 'application/json',
+                'Accept': 'application/x-ndjson, application/json',
+            },
+            body: JSON.stringify(requests),
+            credentials: 'same-origin',
+        };
+        for (var key in init || {}) {
+            options[key] = init[key];
+        }
+        return fetch(this.url, options).then(function(response) {
+            if (response.status !== 200) {
+                throw new Error('Received unexpected status code ' +
+                    response.status + ': ' + response.statusText);
+            }
+            var contentType = response.headers.get('Content-Type') || '';
+            if (contentType.indexOf('application/x-ndjson') !== 0 || !response.body) {
+                return response.json();
+            }
+            var responses = new Array(requests.length);
+            var reader = response.body.getReader();
+            var decoder = new TextDecoder();
+            var buffer = '';
+            var receive = function(line) {
+                if (!line) {
+                    return;
+                }
+                var result = JSON.parse(line);
+                responses[result.index] = result;
+                if (onResult) {
+                    onResult(result.index, result);
+                }
+            };
+            var read = function() {
+                return reader.read().then(function(chunk) {
+                    if (chunk.done) {
+                        receive(buffer + decoder.decode());
+                        return responses;
+                    }
+                    buffer += decoder.decode(chunk.value, {stream: true});
+                    var lines = buffer.split('\n');
+                    buffer = lines.pop();
+                    lines.forEach(receive);
+                    return read();
+                });
+            };
+            return read();
+        });
+    };
+
+    UrlEndpoint.prototype.decode = function(contentType, body) {
+        // binary endpoints receive an ArrayBuffer, which will still contain
+        // json if the server has no msgpack support
+        var bytes = new Uint8Array(body);
+        if ((contentType || '').indexOf('msgpack') >= 0) {
+            return msgpack.decode(bytes);
+        }
+        return JSON.parse(msgpack.decodeText(bytes));
+    };
+
+    UrlEndpoint.prototype.sendEach = function(requests, signal) {
         var self = this;
         return Promise.all(requests.map(function(request) {
-            return self.sendBulk([request]).then(function(result) {
+            return self.sendBulk([request], signal).then(function(result) {
                 return result[0];
             });
         }));
@@ -0,0 +1,164 @@
+/**
+ * Copyright © 2015-2017 STRG.AT GmbH, Vienna, Austria
+ *
+ * This file is part of the The SCORE Framework.
+ *
+ * The SCORE Framework and all its parts are free software: you can redistribute
+ * them and/or modify them under the terms of the GNU Lesser General Public
+ * License version 3 as published by the Free Software Foundation which is in the
+ * file named COPYING.LESSER.txt.
+ *
+ * The SCORE Framework and all its parts are distributed without any WARRANTY;
+ * without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+ * PARTICULAR PURPOSE. For more details see the GNU Lesser General Public
+ * License.
+ *
+ * If you have not received a copy of the GNU Lesser General Public License see
+ * http://www.gnu.org/licenses/.
+ *
+ * The License-Agreement realised between you as Licensee and STRG.AT GmbH as
+ * Licenser including the issue of its valid conclusion and its pre- and
+ * post-contractual effects is governed by the laws of Austria. Any disputes
+ * concerning this License-Agreement including the issue of its valid conclusion
+ * and its pre- and post-contractual effects are exclusively decided by the
+ * competent court, in whose district STRG.AT GmbH has its registered seat, at
+ * the discretion of STRG.AT GmbH also the competent court, in whose district the
+ * Licensee has his registered seat, an establishment or assets.
+ */
+/* eslint-disable */
+
+// Universal Module Loader
+// https://github.com/umdjs/umd
+// https://github.com/umdjs/umd/blob/v1.0.0/returnExports.js
+(function (root, factory) {
+    if (typeof define === 'function' && define.amd) {
+        // AMD. Register as an anonymous module.
+        define(['../url', '../../msgpack'], factory);
+    } else if (typeof module === 'object' && module.exports) {
+        // Node. Does not work with strict CommonJS, but
+        // only CommonJS-like environments that support module.exports,
+        // like Node.
+        module.exports = factory(require('../url'), require('../../msgpack'));
+    } else {
+        // Browser globals (root is window)
+        root.score.jsapi.FetchEndpoint = factory(root.score.jsapi.UrlEndpoint, root.score.jsapi.msgpack);
+    }
+})(this, function(UrlEndpoint, msgpack) {
+
+    // browsers refuse keepalive requests exceeding a total of 64KiB
+    var KEEPALIVE_LIMIT = 60000;
+
+    var FetchEndpoint = function(name, operations, url, method, options) {
+        UrlEndpoint.call(this, name, operations, url, method, options);
+    };
+
+    FetchEndpoint.prototype = Object.create(UrlEndpoint.prototype);
+
+    FetchEndpoint.prototype.send = function(requests, onResult, signal) {
+        var self = this;
+        if (this.method == 'GET') {
+            return this.sendEach(requests, signal);
+        } else if (this.options.streaming && typeof TextDecoder === 'function') {
+            return this.abortable(signal, function(signal) {
+                var body = self.encode(requests);
+                return self.sendStream(requests, onResult, {
+                    body: body,
+                    keepalive: body.length < KEEPALIVE_LIMIT,
+                    signal: signal,
+                });
+            });
+        } else {
+            return this.sendBulk(requests, signal);
+        }
+    };
+
+    FetchEndpoint.prototype.sendBulk = function(requests, signal) {
+        var self = this;
+        return this.abortable(signal, function(signal) {
+            var url = self.url;
+            var init = {
+                method: self.method,
+                credentials: 'same-origin',
+                signal: signal,
+            };
+            if (self.method === 'GET') {
+                var data = [];
+                for (var i = 0; i < requests.length; i++) {
+                    data.push('requests[]=' + encodeURIComponent(JSON.stringify(requests[i])));
+                }
+                url += '?' + data.join('&');
+                if (self.options.binary) {
+                    init.headers = {'Accept': 'application/msgpack'};
+                }
+            } else if (self.options.binary) {
+                init.headers = {
+                    'Content-Type': 'application/msgpack',
+                    'Accept': 'application/msgpack',
+                };
+                init.body = msgpack.encode(requests);
+                init.keepalive = init.body.length < KEEPALIVE_LIMIT;
+            } else {
+                init.headers = {'Content-Type': 'application/json'};
+                init.body = self.encode(requests);
+                // allow the request to outlive the page, if it is small enough
+                init.keepalive = init.body.length < KEEPALIVE_LIMIT;
+            }
+            return fetch(url, init).then(function(response) {
+                if (response.status !== 200) {
+                    throw new Error('Received unexpected status code ' +
+                        response.status + ': ' + response.statusText);
+                }
+                if (self.options.binary) {
+                    return response.arrayBuffer().then(function(body) {
+                        return self.decode(response.headers.get('Content-Type'), body);
+                    });
+                }
+                return response.json();
+            });
+        });
+    };
+
+    FetchEndpoint.prototype.encode = function(requests) {
+        // the keepalive limit applies to the number of bytes
+        var body = JSON.stringify(requests);
+        if (typeof TextEncoder === 'function') {
+            return new TextEncoder().encode(body);
+        }
+        return body;
+    };
+
+    FetchEndpoint.prototype.abortable = function(signal, send) {
+        // invokes *send* with a signal, that aborts the request when the
+        // given *signal* fires or when the configured timeout elapses
+        var timeout = this.options.timeout;
+        if (!timeout || typeof AbortController !== 'function') {
+            return send(signal);
+        }
+        var controller = new AbortController();
+        var abort = function() {
+            controller.abort(signal.reason);
+        };
+        if (signal) {
+            if (signal.aborted) {
+                abort();
+            } else {
+                signal.addEventListener('abort', abort);
+            }
+        }
+        var timer = setTimeout(function() {
+            controller.abort(new Error('Request timed out after ' + timeout + 'ms'));
+        }, timeout);
+        var done = function() {
+            clearTimeout(timer);
+            if (signal) {
+                signal.removeEventListener('abort', abort);
+            }
+        };
+        var promise = send(controller.signal);
+        promise.then(done, done);
+        return promise;
+    };
+
+    return FetchEndpoint;
+
+});
@@ -34,17 +34,17 @@
 (function (root, factory) {
     if (typeof define === 'function' && define.amd) {
         // AMD. Register as an anonymous module.
-        define(['./endpoint', './exception', './excformat'], factory);
+        define(['./endpoint', './exception', './excformat', './columns'], factory);
     } else if (typeof module === 'object' && module.exports) {
         // Node. Does not work with strict CommonJS, but
         // only CommonJS-like environments that support module.exports,
         // like Node.
-        module.exports = factory(require('./endpoint'), require('./exception'), require('./excformat'));
+        module.exports = factory(require('./endpoint'), require('./exception'), require('./excformat'), require('./columns'));
     } else {
         // Browser globals (root is window)
-        root.score.jsapi.Queue = factory(root.score.jsapi.Endpoint, root.score.jsapi.Exception, root.score.jsapi.excformat);
+        root.score.jsapi.Queue = factory(root.score.jsapi.Endpoint, root.score.jsapi.Exception, root.score.jsapi.excformat, root.score.jsapi.rehydrate);
     }
-})(this, function(Endpoint, Exception, excformat) {
+})(this, function(Endpoint, Exception, excformat, rehydrate) {
 
     var defer = function() {
         var resolve, reject;
@@ -59,21 +59,168 @@
         };
     };
 
-    var Queue = function() {
+    var abortReason = function(signal) {
+        if (typeof signal.reason !== 'undefined') {
+            return signal.reason;
+        }
+        return new Error('Call aborted');
+    };
+
+    var complete = function(request) {
+        if (request.settled) {
+            return false;
+        }
+        request.settled = true;
+        if (request.signal) {
+            request.signal.removeEventListener('abort', request.onabort);
+        }
+        if (request.timer !== null) {
+            clearTimeout(request.timer);
+        }
+        return true;
+    };
+
+    var fail = function(request, error) {
+        if (complete(request)) {
+            request.reject(error);
+        }
+    };
+
+    var settle = function(request, response) {
+        if (!complete(request)) {
+            return;
+        }
+        if (!response) {
+            request.reject(new Exception('No response received'));
+            return;
+        }
+        var result = response.result;
+        if (response.success) {
+            if (response.format === 'columns') {
+                result = rehydrate(result);
+            }
+            request.resolve(result);
+            return;
+        }
+        if (result && result.trace) {
+            var desc = request.data[0];
+            if (request.data[1]) {
+                desc += '/' + request.data[1];
+            }
+            var args = ['Error in jsapi call', desc, '('];
+            for (var j = 2; j < request.data.length; j++) {
+                if (j != 2) {
+                    args.push(',');
+                }
+                args.push(request.data[j]);
+            }
+            args.push(')');
+            args.push("\n" + excformat(result));
+            console.error.apply(console, args);  // eslint-disable-line no-console
+        }
+        if (result) {
+            var data = result;
+            if (data.type in Exception.classes) {
+                result = new Exception.classes[data.type](data.message);
+            } else {
+                result = new Exception(data.message);
+            }
+            if (typeof data.retry_after === 'number') {
+                result.retryAfter = data.retry_after;
+            }
+        } else {
+            result = new Exception();
+        }
+        request.reject(result);
+    };
+
+    var Queue = function(options) {
+        this.options = {
+            // "timeout", "microtask", "idle" or a function receiving a
+            // callback, that must be invoked to send the queued requests
+            scheduler: 'timeout',
+            // milliseconds to wait for further calls ("timeout"), or the
+            // maximum time to wait for an idle period ("idle")
+            delay: 1,
+            // maximum number of calls per request, 0 means unlimited
+            maxBatchSize: 0,
+            // approximate maximum size of a request body, 0 means unlimited
+            maxBatchBytes: 0,
+        };
+        this.configure(options);
         this.queuedRequests = [];
+        // maps keys of coalescing requests to queued and in-flight requests
+        this.coalescingRequests = {};
         this.flushDeferred = null;
     };
 
     Queue.prototype = Object.create(Object.prototype);
 
-    Queue.prototype.queue = function(data, endpoint) {
+    Queue.prototype.configure = function(options) {
+        for (var key in options || {}) {
+            this.options[key] = options[key];
+        }
+    };
+
+    Queue.prototype.queue = function(data, endpoint, coalesce, signal, timeout) {
+        var self = this;
+        if (signal && signal.aborted) {
+            return Promise.reject(abortReason(signal));
+        }
+        var key = null;
+        if (coalesce && !signal && !timeout) {
+            // identical calls to idempotent operations share a single
+            // request, regardless of whether it was already sent. calls
+            // with an abort signal or a timeout are never shared, since
+            // aborting one of them must not affect the others.
+            key = endpoint.name + ':' + JSON.stringify(data);
+            if (key in this.coalescingRequests) {
+                return this.coalescingRequests[key].promise;
+            }
+        }
         var request = defer();
         request.data = data;
         request.endpoint = endpoint;
+        request.key = key;
+        request.batch = null;
+        request.signal = signal || null;
+        if (signal) {
+            request.onabort = function() {
+                self.cancel(request, abortReason(signal));
+            };
+            signal.addEventListener('abort', request.onabort);
+        }
+        request.timer = null;
+        if (timeout) {
+            request.timer = setTimeout(function() {
+                self.cancel(request, new Error('Call timed out after ' + timeout + 'ms'));
+            }, timeout);
+        }
         this.queuedRequests.push(request);
+        if (key !== null) {
+            this.coalescingRequests[key] = request;
+        }
         return request.promise;
     };
 
+    Queue.prototype.cancel = function(request, reason) {
+        // rejects a single request: queued requests are simply removed,
+        // in-flight batches are aborted once all of their calls are
+        // cancelled
+        if (request.settled) {
+            return;
+        }
+        var index = this.queuedRequests.indexOf(request);
+        if (index >= 0) {
+            this.queuedRequests.splice(index, 1);
+        }
+        fail(request, reason);
+        var batch = request.batch;
+        if (batch && batch.controller && batch.requests.every(function(r) { return r.settled; })) {
+            batch.controller.abort(reason);
+        }
+    };
+
     Queue.prototype.flush = function() {
         var self = this;
         // return existing flush promise, if there is one
@@ -88,12 +235,53 @@
         this.flushDeferred = defer();
         // wait until current code block is finished before sending the
         // request to the server, we might receive some more requests.
-        window.setTimeout(function() {
+        this.schedule(function() {
             self._flush();
-        }, 1);
+        });
         return this.flushDeferred.promise;
     };
 
+    Queue.prototype.schedule = function(callback) {
+        var scheduler = this.options.scheduler;
+        if (typeof scheduler === 'function') {
+            scheduler(callback);
+        } else if (scheduler === 'microtask') {
+            if (typeof queueMicrotask === 'function') {
+                queueMicrotask(callback);
+            } else {
+                Promise.resolve().then(callback);
+            }
+        } else if (scheduler === 'idle' && typeof requestIdleCallback === 'function') {
+            requestIdleCallback(callback, this.options.delay ? {timeout: this.options.delay} : undefined);
+        } else {
+            setTimeout(callback, this.options.delay);
+        }
+    };
+
+    Queue.prototype.split = function(requests) {
+        // split requests into chunks adhering to the configured batch limits
+        var maxSize = this.options.maxBatchSize;
+        var maxBytes = this.options.maxBatchBytes;
+        if (!maxSize && !maxBytes) {
+            return [requests];
+        }
+        var chunks = [];
+        var chunk = [];
+        var bytes = 0;
+        for (var i = 0; i < requests.length; i++) {
+            var size = maxBytes ? JSON.stringify(requests[i].data).length + 1 : 0;
+            if (chunk.length && ((maxSize && chunk.length >= maxSize) || (maxBytes && bytes + size > maxBytes))) {
+                chunks.push(chunk);
+                chunk = [];
+                bytes = 0;
+            }
+            chunk.push(requests[i]);
+            bytes += size;
+        }
+        chunks.push(chunk);
+        return chunks;
+    };
+
     Queue.prototype._flush = function() {
         var self = this;
         // map transport name to its requests
@@ -105,57 +293,49 @@
             }
             requests[r.endpoint.name].push(r);
         }
+        // forget coalescing requests once they are complete
+        var release = function(requests) {
+            for (var i = 0; i < requests.length; i++) {
+                var key = requests[i].key;
+                if (key !== null && self.coalescingRequests[key] === requests[i]) {
+                    delete self.coalescingRequests[key];
+                }
+            }
+        };
         // send each endpoint's requests
         var send = function(endpoint, requests) {
             var payload = [];
+            var batch = {requests: requests, controller: null};
             for (var i = 0; i < requests.length; i++) {
                 payload.push(requests[i].data);
+                requests[i].batch = batch;
+                if ((requests[i].signal || requests[i].timer !== null) && typeof AbortController === 'function') {
+                    batch.controller = batch.controller || new AbortController();
+                }
             }
-            return endpoint.send(payload).then(function(responses) {
-                for (var i = 0; i < responses.length; i++) {
-                    var response = responses[i],
-                        success = response.success,
-                        result = response.result;
-                    if (success) {
-                        requests[i].resolve(result);
-                    } else {
-                        if (result && result.trace) {
-                            var desc = requests[i].data[0];
-                            if (requests[i].data[1]) {
-                                desc += '/' + requests[i].data[1];
-                            }
-                            var args = ['Error in jsapi call', desc, '('];
-                            for (var j = 2; j < requests[i].data.length; j++) {
-                                if (j != 2) {
-                                    args.push(',');
-                                }
-                                args.push(requests[i].data[j]);
-                            }
-                            args.push(')');
-                            args.push("\n" + excformat(result));
-                            console.error.apply(console, args);  // eslint-disable-line no-console
-                        }
-                        if (result) {
-                            if (result.type in Exception.classes) {
-                                result = new Exception.classes[result.type](result.message);
-                            } else {
-                                result = new Exception(result.message);
-                            }
-                        } else {
-                            result = new Exception();
-                        }
-                        requests[i].reject(result);
-                    }
+            // streaming endpoints report each response as soon as it arrives
+            var onResult = function(i, response) {
+                settle(requests[i], response);
+            };
+            var signal = batch.controller ? batch.controller.signal : undefined;
+            return endpoint.send(payload, onResult, signal).then(function(responses) {
+                for (var i = 0; i < requests.length; i++) {
+                    settle(requests[i], responses[i]);
                 }
+                release(requests);
             }).catch(function(error) {
+                release(requests);
                 for (var i = 0; i < requests.length; i++) {
-                    requests[i].reject(error);
+                    fail(requests[i], error);
                 }
             });
         };
         var promises = [];
         for (var endpointName in requests) {
-            promises.push(send(Endpoint.get(endpointName), requests[endpointName]));
+            var chunks = self.split(requests[endpointName]);
+            for (var j = 0; j < chunks.length; j++) {
+                promises.push(send(Endpoint.get(endpointName), chunks[j]));
+            }
         }
         // TODO: No IE support for Promise.all()
         var promise = Promise.all(promises);
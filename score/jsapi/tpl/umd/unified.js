@@ -54,6 +54,17 @@
 
         _exceptions: {},
 
+        // results of operations with a ttl, in least recently used order
+        _cache: new Map(),
+
+        _cacheSize: 500,
+
+        // abort signal of views created via withSignal()
+        _signal: null,
+
+        // call timeout in milliseconds of views created via withTimeout()
+        _timeout: 0,
+
         _call: function(func, version, args) {
             if (!(func in Jsapi._ops)) {
                 throw new Error("Undefined operation '" + func + "'");
@@ -82,7 +93,83 @@
                 }
                 request.push(args[i]);
             }
-            return queue.queue(request, op.endpoint);
+            if (!op.ttl) {
+                return queue.queue(request, op.endpoint, op.coalesce, this._signal, this._timeout);
+            }
+            var key = JSON.stringify(request);
+            var entry = Jsapi._cache.get(key);
+            if (entry) {
+                Jsapi._cache.delete(key);
+                if (entry.expires > Date.now()) {
+                    Jsapi._cache.set(key, entry);
+                    return Promise.resolve(entry.value);
+                }
+            }
+            var generation = op.generation;
+            var promise = queue.queue(request, op.endpoint, op.coalesce, this._signal, this._timeout);
+            promise.then(function(value) {
+                if (op.generation !== generation) {
+                    return;
+                }
+                Jsapi._cache.delete(key);
+                Jsapi._cache.set(key, {
+                    name: func,
+                    value: value,
+                    expires: Date.now() + op.ttl * 1000,
+                });
+                while (Jsapi._cache.size > Jsapi._cacheSize) {
+                    Jsapi._cache.delete(Jsapi._cache.keys().next().value);
+                }
+            }, function() {});
+            return promise;
+        },
+
+        configure: function(options) {
+            options = options || {};
+            var queueOptions = {};
+            for (var key in options) {
+                if (key === 'cacheSize') {
+                    Jsapi._cacheSize = options[key];
+                } else {
+                    queueOptions[key] = options[key];
+                }
+            }
+            queue.configure(queueOptions);
+        },
+
+        withSignal: function(signal) {
+            // returns a view of this api, whose calls are rejected and
+            // removed from the queue (or aborted, if already sent) once the
+            // given AbortSignal fires
+            var api = Object.create(Jsapi.isPrototypeOf(this) ? this : Jsapi);
+            api._signal = signal;
+            return api;
+        },
+
+        withTimeout: function(timeout) {
+            // returns a view of this api, whose calls are rejected and
+            // removed from the queue (or aborted, if already sent) unless
+            // they complete within given number of milliseconds
+            var api = Object.create(Jsapi.isPrototypeOf(this) ? this : Jsapi);
+            api._timeout = timeout;
+            return api;
+        },
+
+        invalidate: function(func) {
+            for (var name in Jsapi._ops) {
+                if (typeof func === 'undefined' || name === func) {
+                    Jsapi._ops[name].generation++;
+                }
+            }
+            if (typeof func === 'undefined') {
+                Jsapi._cache.clear();
+                return;
+            }
+            Jsapi._cache.forEach(function(entry, key) {
+                if (entry.name === func) {
+                    Jsapi._cache.delete(key);
+                }
+            });
         },
 
         _flush: function() {
@@ -94,8 +181,9 @@
     var registerOperation = function(endpoint, operation) {
         Jsapi[operation.name] = function() {
             var args = Array.prototype.slice.call(arguments);
-            var promise = Jsapi._call(operation.name, args);
-            Jsapi._flush();
+            var api = Jsapi.isPrototypeOf(this) ? this : Jsapi;
+            var promise = api._call(operation.name, args);
+            api._flush();
             return promise;
         };
         Jsapi._ops[operation.name] = {
@@ -104,6 +192,11 @@
             minargs: operation.minargs,
             maxargs: operation.maxargs,
             argnames: operation.argnames,
+            coalesce: !!operation.coalesce,
+            ttl: operation.ttl || 0,
+            // incremented by invalidate(), so that results of calls, that
+            // were sent before, are not cached
+            generation: 0,
             endpoint: endpoint,
         };
     };
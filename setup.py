@@ -54,14 +54,20 @@ setup(
             'tpl/umd/endpoint.js',
             'tpl/umd/queue.js',
             'tpl/umd/endpoint/url.js',
+            'tpl/umd/endpoint/url/fetch.js',
             'tpl/umd/excformat.js',
+            'tpl/umd/msgpack.js',
+            'tpl/umd/columns.js',
             'tpl/es6/unified.js',
             'tpl/es6/exception.js',
             'tpl/es6/queue.js',
             'tpl/es6/endpoint/index.js',
             'tpl/es6/endpoint/url.js',
+            'tpl/es6/endpoint/url/fetch.js',
             'tpl/es6/endpoint/base.js',
             'tpl/es6/excformat.js',
+            'tpl/es6/msgpack.js',
+            'tpl/es6/columns.js',
         ]
     },
     zip_safe=False,
@@ -76,14 +82,24 @@ setup(
         'Operating System :: OS Independent',
         'Programming Language :: JavaScript',
         'Programming Language :: Python :: 3',
-        'Programming Language :: Python :: 3.4',
-        'Programming Language :: Python :: 3.5',
+        'Programming Language :: Python :: 3.7',
+        'Programming Language :: Python :: 3.8',
+        'Programming Language :: Python :: 3.9',
+        'Programming Language :: Python :: 3.10',
+        'Programming Language :: Python :: 3.11',
         'Topic :: Software Development :: Libraries :: Application Frameworks',
     ],
+    python_requires='>=3.7',
     install_requires=[
         'score.init >= 0.3',
         'score.ctx >= 0.3',
     ],
+    extras_require={
+        'orjson': ['orjson'],
+        'minify': ['rjsmin'],
+        'brotli': ['brotli'],
+        'msgpack': ['msgpack'],
+    },
     entry_points={
         'score.cli': [
             'jsapi = score.jsapi.cli:main',
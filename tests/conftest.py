@@ -0,0 +1,27 @@
+import pytest
+
+import score.http
+import score.init
+
+
+@pytest.fixture
+def init_jsapi():
+    """
+    Returns a function initializing score with given endpoints and jsapi
+    configuration.
+    """
+    def init(*endpoints, **conf):
+        score_ = score.init.init({
+            'score.init': {
+                'modules': '\n'.join((
+                    'score.ctx', 'score.tpl', 'score.http', 'score.jsapi')),
+            },
+            'tpl': {'filetype.js.mimetype': 'application/javascript'},
+            'http': {'router': score.http.RouterConfiguration()},
+            'jsapi': conf,
+        }, finalize=False)
+        for endpoint in endpoints:
+            score_.jsapi.add_endpoint(endpoint)
+        score_._finalize()
+        return score_
+    return init
@@ -0,0 +1,45 @@
+import os
+
+import pytest
+
+from score.init import ConfigurationError
+from score.jsapi import ConfiguredJsapiModule, JsonCodec, UrlEndpoint
+from score.jsapi import _compress
+
+
+@pytest.fixture
+def jsapi(init_jsapi):
+    endpoint = UrlEndpoint('math')
+
+    @endpoint.op
+    def add(ctx, a, b):
+        return a + b
+
+    return init_jsapi(endpoint).jsapi
+
+
+def test_build(jsapi, tmpdir):
+    files = jsapi.build(str(tmpdir), compress=['gzip'])
+    assert files
+    for file in files:
+        assert os.path.isfile(file)
+    assert any(file.endswith('.js.gz') for file in files)
+    assert jsapi.build(str(tmpdir), compress=['gzip']) == []
+
+
+def test_build_rejects_unavailable_encoding(jsapi, tmpdir, monkeypatch):
+    monkeypatch.setattr(_compress, 'brotli', None)
+    with pytest.raises(ConfigurationError):
+        jsapi.build(str(tmpdir), compress=['br'])
+    assert not tmpdir.listdir()
+
+
+def test_build_rejects_unknown_encoding(jsapi, tmpdir):
+    with pytest.raises(ConfigurationError):
+        jsapi.build(str(tmpdir), compress=['zip'])
+
+
+def test_construct_without_codec(jsapi):
+    module = ConfiguredJsapiModule(
+        jsapi.ctx, jsapi.tpl, jsapi.http, [], False, 'umd', None)
+    assert isinstance(module.codec, JsonCodec)
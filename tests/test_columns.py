@@ -0,0 +1,47 @@
+import pytest
+
+from score.jsapi import Columns, UrlEndpoint
+
+
+def make_endpoint(init_jsapi, **options):
+    endpoint = UrlEndpoint('columns')
+
+    @endpoint.op(**options)
+    def echo(ctx, value):
+        return value
+
+    init_jsapi(endpoint)
+    return endpoint
+
+
+def test_columns_encode():
+    columns = Columns([{'a': 1}, {'b': 2}])
+    assert columns.encode() == {
+        'length': 2,
+        'keys': ['a', 'b'],
+        'columns': [[1, None], [None, 2]],
+    }
+    assert list(columns) == [{'a': 1}, {'b': 2}]
+
+
+def test_columns_without_rehydration():
+    assert Columns([{'a': 1}], rehydrate=False).encode()['rehydrate'] is False
+
+
+def test_columns_require_dicts():
+    with pytest.raises(TypeError):
+        Columns([1, 2])
+
+
+@pytest.mark.parametrize('value', [[1, 2, 3], [{'a': 1}, 2], 5, None])
+def test_columnar_passes_other_results(init_jsapi, value):
+    endpoint = make_endpoint(init_jsapi, columnar=True)
+    assert endpoint.handle([['echo', '', value]]) == [
+        {'success': True, 'result': value}]
+
+
+def test_columnar_converts_records(init_jsapi):
+    endpoint = make_endpoint(init_jsapi, columnar=True)
+    response, = endpoint.handle([['echo', '', [{'a': 1}, {'a': 2}]]])
+    assert response['format'] == 'columns'
+    assert response['result']['columns'] == [[1, 2]]
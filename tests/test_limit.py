@@ -0,0 +1,145 @@
+import threading
+
+import pytest
+
+from score.jsapi import Limiter, RateLimitExceeded
+from score.jsapi import _limit
+from score.jsapi._limit import MemoryBackend
+
+
+class Clock:
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(_limit.time, 'monotonic', clock)
+    return clock
+
+
+def test_bucket_grants_burst(clock):
+    backend = MemoryBackend()
+    assert [backend.take('a', 1, 3) for _ in range(3)] == [0, 0, 0]
+    assert backend.take('a', 1, 3) == pytest.approx(1)
+
+
+def test_bucket_refills_at_rate(clock):
+    backend = MemoryBackend()
+    for _ in range(2):
+        backend.take('a', 2, 2)
+    assert backend.take('a', 2, 2) == pytest.approx(0.5)
+    clock.now += 0.25
+    assert backend.take('a', 2, 2) == pytest.approx(0.25)
+    clock.now += 0.25
+    assert backend.take('a', 2, 2) == 0
+    clock.now += 100
+    assert [backend.take('a', 2, 2) for _ in range(3)][-1] > 0
+
+
+def test_buckets_are_separated_by_key(clock):
+    backend = MemoryBackend()
+    assert backend.take('a', 1, 1) == 0
+    assert backend.take('a', 1, 1) > 0
+    assert backend.take('b', 1, 1) == 0
+
+
+def test_buckets_are_bounded(clock):
+    backend = MemoryBackend(maxsize=100)
+    for i in range(1000):
+        backend.take(i, 1, 1)
+    assert len(backend._buckets) == 100
+    # the most recently used buckets are kept
+    assert backend.take(999, 1, 1) > 0
+    assert backend.take(0, 1, 1) == 0
+
+
+def test_recently_used_bucket_survives(clock):
+    backend = MemoryBackend(maxsize=2)
+    backend.take('a', 1, 1)
+    backend.take('b', 1, 1)
+    backend.take('a', 1, 1)
+    backend.take('c', 1, 1)
+    assert set(backend._buckets) == {'a', 'c'}
+
+
+def test_concurrency_cap():
+    backend = MemoryBackend()
+    assert backend.enter('a', 2)
+    assert backend.enter('a', 2)
+    assert not backend.enter('a', 2)
+    assert backend.enter('b', 2)
+    backend.leave('a')
+    assert backend.enter('a', 2)
+    for key in ('a', 'a', 'b'):
+        backend.leave(key)
+    assert backend._running == {}
+
+
+def test_concurrency_cap_across_threads():
+    backend = MemoryBackend()
+    barrier = threading.Barrier(8)
+    results = []
+
+    def worker():
+        barrier.wait()
+        results.append(backend.enter('a', 3))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results.count(True) == 3
+
+
+def test_limiter_rate(clock):
+    limiter = Limiter(rate=1, burst=2)
+    for _ in range(2):
+        with limiter.acquire(None):
+            pass
+    with pytest.raises(RateLimitExceeded) as info:
+        with limiter.acquire(None):
+            pass
+    assert info.value.retry_after == pytest.approx(1)
+    clock.now += 1
+    with limiter.acquire(None):
+        pass
+
+
+def test_limiter_concurrency():
+    limiter = Limiter(concurrency=1)
+    with limiter.acquire(None):
+        with pytest.raises(RateLimitExceeded) as info:
+            with limiter.acquire(None):
+                pass
+        assert info.value.retry_after is None
+    with limiter.acquire(None):
+        pass
+    assert limiter.backend._running == {}
+
+
+def test_limiter_releases_slot_on_rate_limit(clock):
+    limiter = Limiter(rate=1, burst=1, concurrency=1)
+    with limiter.acquire(None):
+        pass
+    with pytest.raises(RateLimitExceeded):
+        with limiter.acquire(None):
+            pass
+    assert limiter.backend._running == {}
+
+
+def test_limiter_key(clock):
+    limiter = Limiter(rate=1, burst=1, key=lambda ctx: ctx)
+    with limiter.acquire('alice'):
+        pass
+    with limiter.acquire('bob'):
+        pass
+    with pytest.raises(RateLimitExceeded):
+        with limiter.acquire('alice'):
+            pass
@@ -0,0 +1,57 @@
+import json
+import os
+import shutil
+import subprocess
+
+import pytest
+
+msgpack = pytest.importorskip('msgpack')
+
+node = shutil.which('node')
+pytestmark = pytest.mark.skipif(node is None, reason='requires node')
+
+here = os.path.dirname(os.path.abspath(__file__))
+script = os.path.join(here, os.pardir, 'score', 'jsapi', 'tpl', 'umd',
+                      'msgpack.js')
+
+values = [
+    0, 1, 127, 128, 255, 256, 65535, 65536, 2 ** 32 - 1, 2 ** 32,
+    5000000000, 2 ** 53 - 1, -1, -32, -33, -128, -129, -32768, -32769,
+    -2 ** 31, -2 ** 31 - 1, -5000000000, -2 ** 53 + 1, 0.5, -1.25, 1e300,
+    'text', '', 'ü' * 40, None, True, False, [1, [2, 3]], {'a': {'b': 4}},
+]
+
+
+def run(code, data):
+    result = subprocess.run(
+        [node, '-e', 'var msgpack = require(%s); %s' % (
+            json.dumps(script), code)],
+        input=data, stdout=subprocess.PIPE, check=True)
+    return result.stdout
+
+
+def test_encode():
+    data = run('''
+        var values = JSON.parse(require('fs').readFileSync(0, 'utf8'));
+        process.stdout.write(Buffer.from(msgpack.encode(values)));
+    ''', json.dumps(values).encode('UTF-8'))
+    decoded = msgpack.unpackb(data)
+    assert decoded == values
+    assert [type(value) for value in decoded] == list(map(type, values))
+
+
+def test_decode():
+    data = run('''
+        var data = new Uint8Array(require('fs').readFileSync(0));
+        process.stdout.write(JSON.stringify(msgpack.decode(data)));
+    ''', msgpack.packb(values))
+    assert json.loads(data.decode('UTF-8')) == values
+
+
+def test_unsafe_integers_are_floats():
+    data = run('''
+        process.stdout.write(Buffer.from(msgpack.encode(
+            [Math.pow(2, 53), -Math.pow(2, 60)])));
+    ''', b'')
+    assert msgpack.unpackb(data) == [2.0 ** 53, -2.0 ** 60]
+    assert all(type(value) is float for value in msgpack.unpackb(data))